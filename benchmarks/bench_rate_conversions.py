@@ -0,0 +1,77 @@
+"""Per-conversion cost of InterestRate conversions: the result built through
+pydantic validation (as before InterestRate._construct) against the trusted
+_construct the conversions use now. Both sides compute the same value, so
+the difference is the construction.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rate_conversions
+
+Results are printed and written to bench_output.txt.
+"""
+
+import timeit
+from pathlib import Path
+
+from numpy import e, log
+
+from src.interesting.interest import (
+    CompoundInterestRate,
+    ContinuousInterestRate,
+    equivalent_value,
+)
+
+n_calls = 20_000
+n_repeats = 7
+
+compound = CompoundInterestRate(value=0.1, freq="Y")
+continuous = ContinuousInterestRate(value=0.1, freq="Y")
+
+
+def validated_equivalent():
+    value = equivalent_value(compound.value, compound.freq, "M", "compound")
+    return CompoundInterestRate(value=value, freq="M")
+
+
+def validated_continuous():
+    return ContinuousInterestRate(value=log(1 + compound.value), freq=compound.freq)
+
+
+def validated_compound():
+    return CompoundInterestRate(value=e**continuous.value - 1, freq=continuous.freq)
+
+
+cases = {
+    "convert_to_equivalent": (
+        validated_equivalent,
+        lambda: compound.convert_to_equivalent(new_freq="M"),
+    ),
+    "convert_to_continuous": (validated_continuous, compound.convert_to_continuous),
+    "convert_to_compound": (validated_compound, continuous.convert_to_compound),
+}
+
+
+def per_call_us(function) -> float:
+    # best of n_repeats: the least disturbed run
+    times = timeit.repeat(function, number=n_calls, repeat=n_repeats)
+    return min(times) / n_calls * 1e6
+
+
+def main():
+    lines = [f"{'conversion':<24}{'validated':>12}{'_construct':>12}{'speedup':>10}"]
+    for name, (validated, trusted) in cases.items():
+        assert validated() == trusted()
+        validated_us = per_call_us(validated)
+        trusted_us = per_call_us(trusted)
+        lines.append(
+            f"{name:<24}{validated_us:>10.2f}us{trusted_us:>10.2f}us"
+            f"{validated_us / trusted_us:>9.1f}x"
+        )
+    report = "\n".join(lines)
+    print(report)
+    output = Path(__file__).resolve().parents[1] / "bench_output.txt"
+    output.write_text(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,15 @@ from .utils import bonds_info
 
 
 class Bond(Cashflow):
+    # opt-in on-disk cache of generated cashflows, e.g.
+    # Bond.cache = CashflowCache("~/.cache/interesting")
+    cache = None
+
     def __init__(
         self, name: str, species: str, issuer: str, is_nominal: bool, cashflow: Cashflow
     ):
-        self.data = cashflow.data
+        self._set_columns(cashflow._own_columns())
+        self._freq, self._freq_dates = cashflow._freq, cashflow._freq_dates
         self.name = name
         self.species = species
         self.issuer = issuer
@@ -19,6 +24,42 @@ class Bond(Cashflow):
         self.is_fgc = bonds_info[species]["is_fgc"]
         self.is_taxable = bonds_info[species]["is_taxable"]
 
+    @classmethod
+    def _regular_interest_cashflow(cls, **inputs) -> Cashflow:
+        if cls.cache is None:
+            return Cashflow.from_regular_interest(**inputs)
+        return cls.cache.get_or_build(
+            "from_regular_interest", inputs, Cashflow.from_regular_interest
+        )
+
+    # ------------------------------
+    # persistence
+
+    def _arrow_metadata(self) -> dict:
+        bond = {
+            "name": self.name,
+            "species": self.species,
+            "issuer": self.issuer,
+            "is_nominal": self.is_nominal,
+        }
+        if hasattr(self, "index_name"):
+            bond["index_name"] = self.index_name
+        return {**super()._arrow_metadata(), "bond": bond}
+
+    @classmethod
+    def _from_arrow_metadata(cls, columns, metadata: dict):
+        if "bond" not in metadata:
+            raise ValueError("The table has no bond metadata.")
+        bond = dict(metadata["bond"])
+        index_name = bond.pop("index_name", None)
+        # subclasses build their cashflow in __init__: bypass it
+        instance = cls.__new__(cls)
+        cashflow = Cashflow._from_columns(columns, freq=metadata.get("freq"))
+        Bond.__init__(instance, cashflow=cashflow, **bond)
+        if index_name is not None:
+            instance.index_name = index_name
+        return instance
+
 
 class RealBond(Bond):
     def __init__(
@@ -34,7 +75,7 @@ class RealBond(Bond):
         initial_capital_pmt: float | int,
         inflation=None,
     ):
-        cashflow = Cashflow().from_regular_interest(
+        cashflow = self._regular_interest_cashflow(
             start_date=start_date,
             end_date=end_date,
             interest=interest,
@@ -65,7 +106,7 @@ class NominalBond(Bond):
         interest: InterestRate | pd.DataFrame,
         initial_capital_pmt: float | int,
     ):
-        cashflow = Cashflow().from_regular_interest(
+        cashflow = self._regular_interest_cashflow(
             interest=interest,
             freq=freq,
             start_date=start_date,
@@ -0,0 +1,285 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import uuid
+import weakref
+from datetime import date
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+from pydantic import BaseModel
+
+from .cashflow import Cashflow
+from .portfolio import Portfolio
+from .storage import read_arrow, table_metadata, with_metadata, write_arrow
+
+# ----------------------------------------------------------------------
+# cache keys
+
+try:
+    library_version = version("interesting")
+except PackageNotFoundError:
+    library_version = "unknown"
+
+# bump when the stored layout or the generated columns change
+cache_format = 2
+
+
+def canonical(value):
+    """A JSON-serializable form of a cashflow input, equal for equal inputs
+    (dates by day, numbers as floats, rates by their fields)."""
+    # exact types first: keys are built for every bond
+    kind = type(value)
+    if kind is str or kind is float or value is None or kind is bool:
+        return value
+    if kind is int:
+        return float(value)
+    if isinstance(value, BaseModel):
+        fields = {key: canonical(item) for key, item in value.__dict__.items()}
+        return {"model": kind.__name__, **fields}
+    if isinstance(value, int | float | np.number):
+        return float(value)
+    if isinstance(value, date | np.datetime64):
+        return str(np.asarray(value, dtype="datetime64[D]")[()])
+    if isinstance(value, dict):
+        return {str(key): canonical(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [canonical(item) for item in value]
+    raise TypeError(f"Cannot build a cache key from {kind.__name__}.")
+
+
+def cache_key(name: str, inputs: dict) -> str:
+    key = [library_version, cache_format, name, canonical(inputs)]
+    encoded = json.dumps(key, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+# ----------------------------------------------------------------------
+# on-disk cache
+
+
+class CashflowCache:
+    """Content-addressed on-disk cache of generated cashflows.
+
+    Entries are keyed by a hash of the generator's inputs and the library
+    version, and written in batches: put() holds new entries in memory and
+    flush() writes them as one segment, an Arrow IPC file in the Portfolio
+    book layout with the entries' keys in its metadata. flush() also runs
+    once batch_size entries are pending, when the cache is closed or
+    collected, and at exit (but not in processes ended by os._exit, such
+    as multiprocessing workers: flush those explicitly).
+
+    A process memory-maps every segment once and serves all of its entries
+    from views of the mapping, so a warm start costs one file per segment,
+    not one per cashflow. Segments are written to a temporary name and
+    renamed into place, so processes sharing the directory never read a
+    partial one; a miss looks for segments written by other processes
+    since. Once the directory grows past maxbytes the least recently used
+    segments are removed.
+    """
+
+    prefix = "segment-"
+    suffix = ".arrow"
+
+    def __init__(self, directory, maxbytes: int = 1 << 30, batch_size: int = 1024):
+        assert maxbytes > 0, "maxbytes must be positive."
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.maxbytes = maxbytes
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (segment path, columns, freq)
+        self._index = {}
+        # segment path -> bytes, for the segments mapped by this process
+        self._segments = {}
+        self._touched = set()
+        # key -> cashflow, not written yet; flushed at exit or collection
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(
+            self, _write_segment, self.directory, self._pending
+        )
+
+    def __str__(self):
+        stats = self.stats()
+        return f"CashflowCache: {stats['entries']} entries in {stats['segments']} segments, {stats['nbytes']}/{stats['maxbytes']} bytes, {stats['hits']} hits, {stats['misses']} misses."
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def _segment_paths(self) -> list[tuple[float, int, str]]:
+        # (mtime, size, path) of every segment, oldest first
+        segments = []
+        for entry in os.scandir(self.directory):
+            if not (
+                entry.name.startswith(self.prefix) and entry.name.endswith(self.suffix)
+            ):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            segments.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(segments)
+
+    def _refresh(self):
+        # map the segments written since the last scan; called with the lock
+        for _, size, path in self._segment_paths():
+            if path in self._segments:
+                continue
+            try:
+                table = read_arrow(path)
+            except (OSError, pa.ArrowInvalid):
+                # evicted by another process meanwhile
+                continue
+            self._segments[path] = size
+            keys = table_metadata(table)["keys"]
+            cashflows = Portfolio.from_arrow_table(table).bonds
+            for key, cashflow in zip(keys, cashflows):
+                if key not in self._index:
+                    self._index[key] = (path, cashflow._get_columns(), cashflow._freq)
+
+    def get(self, key: str) -> Cashflow | None:
+        with self._lock:
+            cashflow = self._pending.get(key)
+            if cashflow is not None:
+                self.hits += 1
+                return Cashflow._from_columns(cashflow._get_columns(), cashflow._freq)
+            entry = self._index.get(key)
+            if entry is None:
+                self._refresh()
+                entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            path, columns, freq = entry
+            if path not in self._touched:
+                # once per segment and process: mtime orders eviction
+                self._touched.add(path)
+                with contextlib.suppress(OSError):
+                    os.utime(path)
+        return Cashflow._from_columns(columns, freq)
+
+    def put(self, key: str, cashflow: Cashflow):
+        with self._lock:
+            self._pending[key] = cashflow
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def get_or_build(self, name: str, inputs: dict, build) -> Cashflow:
+        """The cached cashflow for build(**inputs), building and storing it
+        on a miss."""
+        key = cache_key(name, inputs)
+        cashflow = self.get(key)
+        if cashflow is None:
+            cashflow = build(**inputs)
+            self.put(key, cashflow)
+        return cashflow
+
+    def flush(self):
+        """Write the pending entries as one segment."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        # called with the lock held
+        if not self._pending:
+            return
+        _write_segment(self.directory, self._pending)
+        self._refresh()
+        if sum(size for _, size, _ in self._segment_paths()) > self.maxbytes:
+            self._evict()
+
+    def close(self):
+        self.flush()
+        self._finalizer.detach()
+
+    def _evict(self):
+        # whole segments, down to 90% of maxbytes, so eviction does not run
+        # on every flush
+        segments = self._segment_paths()
+        nbytes = sum(size for _, size, _ in segments)
+        evicted = set()
+        for _, size, path in segments:
+            if nbytes <= 0.9 * self.maxbytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # evicted by another process
+                nbytes -= size
+            except OSError:
+                # still mapped elsewhere, on platforms that forbid removing it
+                continue
+            else:
+                nbytes -= size
+                self.evictions += 1
+            evicted.add(path)
+        if evicted:
+            self._index = {
+                key: entry
+                for key, entry in self._index.items()
+                if entry[0] not in evicted
+            }
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            self._refresh()
+            segments = self._segment_paths()
+            paths = {path for _, _, path in segments}
+            entries = sum(entry[0] in paths for entry in self._index.values())
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "pending": len(self._pending),
+                "segments": len(segments),
+                "nbytes": sum(size for _, size, _ in segments),
+                "maxbytes": self.maxbytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._segment_paths():
+                Path(path).unlink(missing_ok=True)
+            self._index.clear()
+            self._segments.clear()
+            self._touched.clear()
+            self._pending.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+def _write_segment(directory: Path, pending: dict):
+    # a module function, so the cache's finalizer holds no reference to it
+    if not pending:
+        return
+    keys = list(pending)
+    table = Portfolio().add_bond(list(pending.values())).to_arrow_table()
+    table = with_metadata(table, {**table_metadata(table), "keys": keys})
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        write_arrow(table, tmp_path)
+        path = directory / f"{CashflowCache.prefix}{uuid.uuid4().hex}.arrow"
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    pending.clear()
@@ -0,0 +1,204 @@
+from functools import cache
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+# holidays
+
+# national holidays as listed by ANBIMA, keyed by (month, day)
+brazilian_fixed_holidays = {
+    (1, 1): "confraternizacao universal",
+    (4, 21): "tiradentes",
+    (5, 1): "dia do trabalho",
+    (9, 7): "independencia do brasil",
+    (10, 12): "nossa senhora aparecida",
+    (11, 2): "finados",
+    (11, 15): "proclamacao da republica",
+    (12, 25): "natal",
+}
+
+# moveable holidays, in days from easter sunday
+brazilian_easter_holidays = {
+    -48: "carnaval (segunda)",
+    -47: "carnaval (terca)",
+    -2: "paixao de cristo",
+    60: "corpus christi",
+}
+
+# dia nacional de zumbi e da consciencia negra (lei 14.759/2023)
+black_consciousness_day_since = 2024
+
+
+def easter_sundays(years) -> np.ndarray:
+    # anonymous gregorian algorithm
+    y = np.asarray(years, dtype=np.int64)
+    a = y % 19
+    b = y // 100
+    c = y % 100
+    d = b // 4
+    e = b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i = c // 4
+    k = c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return _from_year_month_day(y, month, day)
+
+
+def brazilian_national_holidays(start_year: int = 2001, end_year: int = 2099):
+    years = np.arange(start_year, end_year + 1)
+
+    holidays = [
+        _from_year_month_day(years, month, day)
+        for month, day in brazilian_fixed_holidays
+    ]
+    easter = easter_sundays(years)
+    holidays += [easter + offset for offset in brazilian_easter_holidays]
+    holidays.append(
+        _from_year_month_day(years[years >= black_consciousness_day_since], 11, 20)
+    )
+    return np.unique(np.concatenate(holidays))
+
+
+def _from_year_month_day(years, months, days) -> np.ndarray:
+    years = np.asarray(years, dtype=np.int64)
+    months = (years - 1970) * 12 + np.asarray(months, dtype=np.int64) - 1
+    first_days = months.astype("datetime64[M]").astype("datetime64[D]")
+    return first_days + np.asarray(days, dtype=np.int64) - 1
+
+
+# ----------------------------------------------------------------------
+# calendars
+
+
+class BusinessCalendar:
+    """Business days over a fixed date range, with O(1) lookups.
+
+    The calendar precomputes, for every day in [start_date, end_date], how
+    many business days come before it. Counting business days between two
+    dates is then a subtraction, and rolling or shifting dates is an index
+    into the sorted business days.
+    """
+
+    def __init__(self, holidays, start_date, end_date, weekmask="1111100"):
+        self.start_date = np.datetime64(start_date, "D")
+        self.end_date = np.datetime64(end_date, "D")
+        assert self.start_date <= self.end_date, "Start date must be before end date."
+        self.holidays = np.unique(np.asarray(holidays, dtype="datetime64[D]"))
+        self.weekmask = weekmask
+
+        days = np.arange(self.start_date, self.end_date + 1)
+        self._is_business_day = np.is_busday(
+            days, weekmask=weekmask, holidays=self.holidays
+        )
+        # business days in [start_date, start_date + offset)
+        self._cumulative_business_days = np.concatenate(
+            [[0], np.cumsum(self._is_business_day)]
+        )
+        self._business_day_offsets = np.flatnonzero(self._is_business_day)
+
+    def __str__(self):
+        n_business_days = len(self._business_day_offsets)
+        return f"BusinessCalendar: from {self.start_date} to {self.end_date} with {n_business_days} business days."
+
+    def __repr__(self):
+        return self.__str__()
+
+    # ------------------------------
+    # lookups
+
+    def _to_offsets(self, dates) -> np.ndarray:
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        offsets = (dates - self.start_date).astype(np.int64)
+        if np.any((offsets < 0) | (offsets >= len(self._is_business_day))):
+            raise ValueError(
+                f"Dates must be within [{self.start_date}, {self.end_date}]."
+            )
+        return offsets
+
+    def _from_business_day_index(self, index) -> np.ndarray:
+        if np.any((index < 0) | (index >= len(self._business_day_offsets))):
+            raise ValueError(
+                f"Business days must be within [{self.start_date}, {self.end_date}]."
+            )
+        return self.start_date + self._business_day_offsets[index]
+
+    def is_business_day(self, dates) -> np.ndarray:
+        return self._is_business_day[self._to_offsets(dates)]
+
+    def business_days_between(self, start_dates, end_dates) -> np.ndarray:
+        """Business days in [start_date, end_date), as np.busday_count."""
+        start_offsets = self._to_offsets(start_dates)
+        end_offsets = self._to_offsets(end_dates)
+        cumulative = self._cumulative_business_days
+        return cumulative[end_offsets] - cumulative[start_offsets]
+
+    # ------------------------------
+    # rolls
+
+    def roll_following(self, dates) -> np.ndarray:
+        index = self._cumulative_business_days[self._to_offsets(dates)]
+        return self._from_business_day_index(index)
+
+    def roll_preceding(self, dates) -> np.ndarray:
+        index = self._cumulative_business_days[self._to_offsets(dates) + 1] - 1
+        return self._from_business_day_index(index)
+
+    def roll_modified_following(self, dates) -> np.ndarray:
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        following = self.roll_following(dates)
+        is_next_month = following.astype("datetime64[M]") != dates.astype(
+            "datetime64[M]"
+        )
+        if not np.any(is_next_month):
+            return following
+        return np.where(is_next_month, self.roll_preceding(dates), following)
+
+    def add_business_days(self, dates, n_days, roll="following") -> np.ndarray:
+        """Shift dates by n_days business days, as np.busday_offset."""
+        offsets = self._to_offsets(dates)
+        cumulative = self._cumulative_business_days
+        if roll == "following":
+            index = cumulative[offsets]
+        elif roll == "preceding":
+            index = cumulative[offsets + 1] - 1
+        else:
+            raise ValueError(f"roll=={roll}, but must be 'following' or 'preceding'.")
+        return self._from_business_day_index(index + np.asarray(n_days))
+
+
+@cache
+def anbima_calendar() -> BusinessCalendar:
+    return BusinessCalendar(
+        holidays=brazilian_national_holidays(2001, 2099),
+        start_date="2001-01-01",
+        end_date="2099-12-31",
+    )
+
+
+# ----------------------------------------------------------------------
+# shortcuts (anbima calendar by default)
+
+
+def business_days_between(start_dates, end_dates, calendar=None) -> np.ndarray:
+    calendar = anbima_calendar() if calendar is None else calendar
+    return calendar.business_days_between(start_dates, end_dates)
+
+
+def add_business_days(dates, n_days, calendar=None) -> np.ndarray:
+    calendar = anbima_calendar() if calendar is None else calendar
+    return calendar.add_business_days(dates, n_days)
+
+
+def roll_following(dates, calendar=None) -> np.ndarray:
+    calendar = anbima_calendar() if calendar is None else calendar
+    return calendar.roll_following(dates)
+
+
+def roll_modified_following(dates, calendar=None) -> np.ndarray:
+    calendar = anbima_calendar() if calendar is None else calendar
+    return calendar.roll_modified_following(dates)
@@ -1,28 +1,149 @@
 # general
+from collections.abc import Mapping
 from datetime import datetime
 
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
-import numpy_financial as npf
+import numpy as np
 import pandas as pd
-
-from .interest import CompoundInterestRate
+import pyarrow as pa
+
+from .interest import CompoundInterestRate, InterestRate, TermStructure
+from .plotting import lttb, min_max_decimate, top_indices
+from .risk import risk_measures
+from .solvers import irr_many, solve_rates, xirr_many
+from .storage import (
+    column_to_numpy,
+    read_arrow,
+    read_parquet,
+    table_metadata,
+    with_metadata,
+    write_arrow,
+    write_parquet,
+)
 from .time import (
+    BucketIndex,
     calculate_delta_freq,
-    calculate_delta_years,
+    calculate_delta_years_array,
     datetime_to_string,
     det_freq_of_date_range,
-    generate_freq_date_range,
+    months_in_schedule_freq,
+    parse_date_column,
     same_or_last_date_in_next_month,
+    schedule_cache,
     string_to_datetime,
+    year_fraction,
 )
-from .utils import calc_brazilian_tax_rate, date_format_from_freq
+from .utils import date_format_from_freq, tax_rates_after_n_days
 from .value import Value
 
+# Intermediate columns that are rates, factors or day counts rather than
+# amounts: they don't add up across cashflows.
+non_additive_cols = {"delta_days", "taxRate", "delta_years", "deflator"}
+non_additive_suffixes = ("_discount_yield", "_discount_factor")
+
+
+def is_additive(col: str) -> bool:
+    return col not in non_additive_cols and not col.endswith(non_additive_suffixes)
+
+
+class FrameColumns(Mapping):
+    """The columns of a DataFrame as arrays, each converted on first read:
+    reading one column of a wide frame doesn't convert the others."""
+
+    __slots__ = ("arrays", "frame")
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.arrays = {}
+
+    def __getitem__(self, col) -> np.ndarray:
+        values = self.arrays.get(col)
+        if values is None:
+            values = self.arrays[col] = self.frame[col].to_numpy()
+        return values
+
+    def __iter__(self):
+        return iter(self.frame.columns)
+
+    def __len__(self):
+        return len(self.frame.columns)
+
+    def __contains__(self, col):
+        return col in self.frame.columns
+
+
+class CashflowColumns:
+    """Columnar core of a Cashflow: a date array plus named column arrays.
+
+    Arrays are shared between cashflows and never modified in place:
+    operations build new arrays and return a new CashflowColumns.
+    """
+
+    __slots__ = ("columns", "dates")
+
+    def __init__(self, dates: np.ndarray, columns: dict[str, np.ndarray]):
+        self.dates = dates
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __contains__(self, col):
+        return col in self.columns
+
+    def __getitem__(self, col) -> np.ndarray:
+        return self.columns[col]
+
+    @classmethod
+    def from_pandas(cls, df: pd.DataFrame, copy: bool = False) -> "CashflowColumns":
+        # copy=True for frames the caller may still modify in place;
+        # otherwise columns are views, converted when first read
+        if copy:
+            columns = {col: df[col].to_numpy(copy=True) for col in df.columns}
+            return cls(dates=df.index.to_numpy(copy=True), columns=columns)
+        return cls(dates=df.index.to_numpy(), columns=FrameColumns(df))
+
+    def to_pandas(self) -> pd.DataFrame:
+        index = pd.DatetimeIndex(self.dates, name="date")
+        return pd.DataFrame(dict(self.columns), index=index)
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table) -> "CashflowColumns":
+        # columns are views of the table's buffers, not copies
+        dates = column_to_numpy(table, "date")
+        if dates.dtype != "datetime64[ns]":
+            dates = dates.astype("datetime64[ns]")
+        columns = {
+            col: column_to_numpy(table, col)
+            for col in table.column_names
+            if col != "date"
+        }
+        return cls(dates=dates, columns=columns)
+
+    def to_arrow(self) -> pa.Table:
+        arrays = {"date": pa.array(self.dates.astype("datetime64[ns]"))}
+        arrays.update({col: pa.array(values) for col, values in self.columns.items()})
+        return pa.table(arrays)
+
+    def with_columns(self, **columns: np.ndarray) -> "CashflowColumns":
+        return CashflowColumns(dates=self.dates, columns={**self.columns, **columns})
+
+    def select(self, cols: list[str]) -> "CashflowColumns":
+        columns = {col: self.columns[col] for col in cols}
+        return CashflowColumns(dates=self.dates, columns=columns)
+
 
 class Cashflow:
+    _freq = None
+    _freq_dates = None
+    _core = None
+    _data = None
+
     def __init__(self):
-        self.data = pd.DataFrame()
+        self._set_columns(
+            CashflowColumns(dates=np.array([], dtype="datetime64[ns]"), columns={})
+        )
         # XXX
         # self.freq
         # self.start_date
@@ -30,7 +151,7 @@ class Cashflow:
         # self.capital
 
     def __str__(self):
-        index = self.data.index
+        index = pd.DatetimeIndex(self._get_columns().dates)
         start_date = datetime_to_string(min(index))
         end_date = datetime_to_string(max(index))
         n_obs = len(index)
@@ -39,6 +160,95 @@ class Cashflow:
     def __repr__(self):
         return self.__str__()
 
+    # ------------------------------
+    # state
+
+    # The cashflow lives either in its columnar core or, once .data has been
+    # requested, in that DataFrame: callers may modify it in place, so it
+    # stays the source of truth until a method sets new columns.
+
+    @property
+    def data(self) -> pd.DataFrame:
+        if self._data is None:
+            self._data = self._core.to_pandas()
+            self._core = None
+        return self._data
+
+    @data.setter
+    def data(self, data: pd.DataFrame):
+        self._data = data
+        self._core = None
+
+    def _get_columns(self) -> CashflowColumns:
+        # for reads: views of .data while it is the source of truth
+        if self._data is not None:
+            return CashflowColumns.from_pandas(self._data)
+        return self._core
+
+    def _own_columns(self) -> CashflowColumns:
+        # for building new columns: .data was handed out and may still be
+        # modified in place, so its arrays are copied rather than shared
+        if self._data is not None:
+            return CashflowColumns.from_pandas(self._data, copy=True)
+        return self._core
+
+    def _get_dates(self):
+        # the index itself while .data is set: the same object on every
+        # call, so the cached freq is found by identity
+        if self._data is not None:
+            return self._data.index
+        return self._core.dates
+
+    def _set_columns(self, columns: CashflowColumns, freq: str | None = None):
+        self._core = columns
+        self._data = None
+        if freq is not None:
+            self._freq = freq
+            self._freq_dates = columns.dates
+
+    @property
+    def freq(self) -> str:
+        return self._detect_freq(self._get_dates())
+
+    @freq.setter
+    def freq(self, freq: str):
+        self._freq = freq
+        self._freq_dates = self._get_dates()
+
+    def _detect_freq(self, dates) -> str:
+        # the freq is cached against the dates it was detected on
+        if self._freq is None or not (
+            self._freq_dates is dates or np.array_equal(self._freq_dates, dates)
+        ):
+            self._freq = det_freq_of_date_range(dates)
+        self._freq_dates = dates
+        return self._freq
+
+    # ------------------------------
+    # transformations
+
+    def _apply(self, step: str, **kwargs):
+        data = self._own_columns()
+        if step == "agg_to_freq":
+            data, freq = self._agg_to_freq(data, **kwargs)
+            self._set_columns(data, freq=freq)
+            return self
+        if step.startswith("discount_") and kwargs["convention"] is None:
+            # per-period discounting needs a regular index
+            self._except_irregular_freq(self._detect_freq(data.dates))
+        self._set_columns(getattr(self, f"_{step}")(data, **kwargs))
+        return self
+
+    @staticmethod
+    def _with_intermediates(
+        data: CashflowColumns, keep, intermediates: dict, columns: dict
+    ) -> CashflowColumns:
+        if keep is not None:
+            intermediates = {
+                col: values for col, values in intermediates.items() if col in keep
+            }
+        return data.with_columns(**intermediates, **columns)
+
     # ------------------------------
     # load data
 
@@ -47,11 +257,13 @@ class Cashflow:
         instance = cls()
         data = df.copy()
         if "date" in data.columns:
-            data["date"] = pd.to_datetime(data["date"])
+            data["date"] = parse_date_column(data["date"])
             data = data.set_index("date")
             data = data.rename_axis("date")
-        else:
-            data.index = pd.DatetimeIndex(data.index)
+        elif not isinstance(data.index, pd.DatetimeIndex):
+            data.index = pd.DatetimeIndex(
+                parse_date_column(data.index), name=data.index.name
+            )
         if data.index.name != "date":
             raise ValueError("Index must be named 'date'.")
         if not isinstance(data.index, pd.DatetimeIndex):
@@ -59,20 +271,75 @@ class Cashflow:
                 f"Index must be pd.DatetimeIndex. Instead, it is {type(data.index)}."
             )
 
-        instance.data = data
-        instance.freq = det_freq_of_date_range(data.index)
+        # data is already a private copy: no need to keep it as .data
+        instance._set_columns(CashflowColumns.from_pandas(data))
         return instance
 
     @classmethod
     def from_json(cls, rows):
         return cls.from_pandas(pd.DataFrame(rows))
 
+    @classmethod
+    def _from_columns(
+        cls, columns: CashflowColumns, freq: str | None = None
+    ) -> "Cashflow":
+        # trusted constructor for arrays built by the library itself: no
+        # copy, date parsing or validation, and no freq detection if known
+        instance = cls.__new__(cls)
+        instance._set_columns(columns, freq=freq)
+        return instance
+
+    # ------------------------------
+    # persistence
+
+    # A cashflow is stored as an Arrow table with a "date" column and the
+    # freq (plus the bond attributes of a Bond) in the schema metadata, so
+    # loading it needs no date parsing or freq detection. from_arrow maps
+    # the file into memory and wraps its buffers without copying.
+
+    def _arrow_metadata(self) -> dict:
+        return {"freq": self.freq}
+
+    @classmethod
+    def _from_arrow_metadata(cls, columns: CashflowColumns, metadata: dict):
+        return cls._from_columns(columns, freq=metadata.get("freq"))
+
+    def to_arrow_table(self) -> pa.Table:
+        table = self._get_columns().to_arrow()
+        return with_metadata(table, self._arrow_metadata())
+
+    @classmethod
+    def from_arrow_table(cls, table: pa.Table):
+        columns = CashflowColumns.from_arrow(table)
+        return cls._from_arrow_metadata(columns, table_metadata(table))
+
+    def to_arrow(self, path):
+        write_arrow(self.to_arrow_table(), path)
+
+    @classmethod
+    def from_arrow(cls, path):
+        return cls.from_arrow_table(read_arrow(path))
+
+    def to_parquet(self, path, **kwargs):
+        write_parquet(self.to_arrow_table(), path, **kwargs)
+
+    @classmethod
+    def from_parquet(cls, path):
+        return cls.from_arrow_table(read_parquet(path))
+
     @classmethod
     def det_dates(cls, start_date, end_date, freq, n_periods):
+        dates = cls._det_date_array(start_date, end_date, freq, n_periods)
+        return pd.DatetimeIndex(dates.astype("datetime64[ns]"), name="date")
+
+    @classmethod
+    def _det_date_array(cls, start_date, end_date, freq, n_periods) -> np.ndarray:
         """Determine date range from:
         - start_date + end_date + freq
         - endData + n_periods + freq of pmts
         - start_date + n_periods + freq
+
+        Schedules are shared through time.schedule_cache.
         """
         months_in_freq = {
             "Y": 12,
@@ -100,23 +367,41 @@ class Cashflow:
                 )
         else:
             raise ValueError()
-        dates = generate_freq_date_range(start_date, end_date, freq)
-        return dates
+        return schedule_cache.get(start_date, end_date, freq)
 
     @classmethod
     def gen_amount_pmts(
         cls, pmt_amount, n_periods, gradient_yield=0.0, gradient_amount=0.0
-    ):
-        if gradient_yield != 0.0:
-            pmts = [
-                pmt_amount * (1 + gradient_yield) ** period
-                for period in range(n_periods)
-            ]
-        else:
-            pmts = [
-                (pmt_amount + gradient_amount * period) for period in range(n_periods)
-            ]
-        return pmts
+    ) -> np.ndarray:
+        return cls.gen_amount_pmts_many(
+            pmt_amounts=[pmt_amount],
+            n_periods=[n_periods],
+            gradient_yields=gradient_yield,
+            gradient_amounts=gradient_amount,
+        )[0]
+
+    @staticmethod
+    def gen_amount_pmts_many(
+        pmt_amounts, n_periods, gradient_yields=0.0, gradient_amounts=0.0
+    ) -> np.ndarray:
+        """Payments of many contracts as a (contracts x periods) array.
+
+        Rows shorter than the longest contract are padded with zeros. As in
+        gen_amount_pmts, a non-zero gradient_yield takes precedence over
+        gradient_amount.
+        """
+        pmt_amounts, gradient_yields, gradient_amounts = (
+            np.asarray(values, dtype=np.float64).reshape(-1, 1)
+            for values in (pmt_amounts, gradient_yields, gradient_amounts)
+        )
+        n_periods = np.asarray(n_periods, dtype=np.int64).reshape(-1, 1)
+        periods = np.arange(n_periods.max(initial=0))
+        pmts = np.where(
+            gradient_yields != 0.0,
+            pmt_amounts * (1 + gradient_yields) ** periods,
+            pmt_amounts + gradient_amounts * periods,
+        )
+        return np.where(periods < n_periods, pmts, 0.0)
 
     @classmethod
     def from_regular_pmt(
@@ -137,14 +422,12 @@ class Cashflow:
         if isinstance(end_date, str):
             end_date = string_to_datetime(end_date)
 
-        dates = cls.det_dates(
+        dates = cls._det_date_array(
             start_date=start_date,
             end_date=end_date,
             n_periods=n_periods,
             freq=freq,
         )
-        start_date = dates[0]
-        end_date = dates[-1]
 
         pmts = cls.gen_amount_pmts(
             pmt_amount=pmt_amount,
@@ -152,13 +435,13 @@ class Cashflow:
             gradient_yield=gradient_yield,
             gradient_amount=gradient_amount,
         )
-        df = pd.DataFrame(index=dates).rename_axis("date")
-        df["interest_paid"] = [0] + pmts
-        df["principal"] = 0.0
-        df.at[start_date, "principal"] = initial_capital_pmt
-        df.at[end_date, "principal"] = final_capital_pmt
-        df["brutto"] = df["principal"] + df["interest_paid"]
-        return cls.from_pandas(df=df)
+        return cls._from_pmts(
+            dates=dates,
+            pmts=pmts,
+            initial_capital_pmt=initial_capital_pmt,
+            final_capital_pmt=final_capital_pmt,
+            freq=freq,
+        )
 
     @classmethod
     def gen_interest_pmts(
@@ -168,15 +451,62 @@ class Cashflow:
         initial_capital_pmt,
         inflation_rate=0,
         gradient_yield=0.0,
-    ):
-        pmts = [
-            (1 + interest_rate * ((1 + gradient_yield) ** period))
-            * (1 + inflation_rate)
-            - 1
-            for period in range(0, n_periods)
-        ]
-        pmts = [-initial_capital_pmt * p for p in pmts]
-        return pmts
+    ) -> np.ndarray:
+        return cls.gen_interest_pmts_many(
+            interest_rates=[interest_rate],
+            n_periods=[n_periods],
+            initial_capital_pmts=[initial_capital_pmt],
+            inflation_rates=inflation_rate,
+            gradient_yields=gradient_yield,
+        )[0]
+
+    @staticmethod
+    def gen_interest_pmts_many(
+        interest_rates,
+        n_periods,
+        initial_capital_pmts,
+        inflation_rates=0.0,
+        gradient_yields=0.0,
+    ) -> np.ndarray:
+        """Interest payments of many contracts, zero-padded as in
+        gen_amount_pmts_many."""
+        interest_rates, initial_capital_pmts, inflation_rates, gradient_yields = (
+            np.asarray(values, dtype=np.float64).reshape(-1, 1)
+            for values in (
+                interest_rates,
+                initial_capital_pmts,
+                inflation_rates,
+                gradient_yields,
+            )
+        )
+        n_periods = np.asarray(n_periods, dtype=np.int64).reshape(-1, 1)
+        periods = np.arange(n_periods.max(initial=0))
+        rates = (1 + interest_rates * (1 + gradient_yields) ** periods) * (
+            1 + inflation_rates
+        ) - 1
+        return np.where(periods < n_periods, -initial_capital_pmts * rates, 0.0)
+
+    @classmethod
+    def _from_pmts(
+        cls, dates, pmts, initial_capital_pmt, final_capital_pmt, freq=None
+    ) -> "Cashflow":
+        interest_paid = np.concatenate([[0.0], np.asarray(pmts, dtype=np.float64)])
+        principal = np.zeros(len(dates))
+        principal[0] = initial_capital_pmt
+        principal[-1] = final_capital_pmt
+        columns = CashflowColumns(
+            dates=np.asarray(dates, dtype="datetime64[ns]"),
+            columns={
+                "interest_paid": interest_paid,
+                "principal": principal,
+                "brutto": principal + interest_paid,
+            },
+        )
+        # generated schedules of two or more dates have the freq they were
+        # generated with; "F" pairs can still look like a regular freq
+        if freq not in months_in_schedule_freq or len(dates) < 2:
+            freq = None
+        return cls._from_columns(columns, freq=freq)
 
     @classmethod
     def from_regular_interest(
@@ -197,14 +527,14 @@ class Cashflow:
         if isinstance(end_date, str):
             end_date = string_to_datetime(end_date)
 
-        dates = cls.det_dates(
+        dates = cls._det_date_array(
             start_date=start_date,
             end_date=end_date,
             n_periods=n_periods,
             freq=freq,
         )
-        start_date = dates[0]
-        end_date = dates[-1]
+        start_date = pd.Timestamp(dates[0])
+        end_date = pd.Timestamp(dates[-1])
         if freq != "F":
             interest = interest.convert_to_equivalent(new_freq=freq)
             inflation = inflation.convert_to_equivalent(new_freq=freq)
@@ -226,13 +556,13 @@ class Cashflow:
                 * (1 + inflation.value) ** (delta_time)
                 + initial_capital_pmt
             ]
-        df = pd.DataFrame(index=dates).rename_axis("date")
-        df["interest_paid"] = [0] + pmts
-        df["principal"] = 0.0
-        df.at[start_date, "principal"] = initial_capital_pmt
-        df.at[end_date, "principal"] = final_capital_pmt
-        df["brutto"] = df["principal"] + df["interest_paid"]
-        return cls.from_pandas(df=df)
+        return cls._from_pmts(
+            dates=dates,
+            pmts=pmts,
+            initial_capital_pmt=initial_capital_pmt,
+            final_capital_pmt=final_capital_pmt,
+            freq=freq,
+        )
 
     @classmethod
     def from_equal_pmts(
@@ -275,7 +605,7 @@ class Cashflow:
             initial_capital_pmt=initial_capital_pmt,
         )
 
-        instance.data = instance.data[["brutto"]]
+        instance._set_columns(instance._get_columns().select(["brutto"]))
 
         return instance
 
@@ -285,7 +615,9 @@ class Cashflow:
         return list(self.data.index)
 
     def get_cols(self):
-        return list(self.data.columns)
+        if self._data is not None:
+            return self._data.columns.tolist()
+        return list(self._core.columns)
 
     def get_point(self, point):
         return self.data.loc[point]
@@ -293,121 +625,359 @@ class Cashflow:
     # ------------------------------
     # aggregation
 
-    def agg_to_freq(self, freq: str):
-        assert freq in {
-            "ME",
-            "YE",
-            "QE",
-            "BME",
-            "BYE",
-            "BQE",
-            "W",
-        }, "Pandas only allows limited frequencies."
-        data = self.data.copy()
-        data = data.resample(freq).sum()
-        self.data = data
+    agg_freqs = {"ME", "YE", "QE", "BME", "BYE", "BQE", "W"}
+
+    def agg_to_freq(self, freq: str | None = None, bucket_index=None):
+        """Sum all columns by freq bucket, as DataFrame.resample(freq).sum().
+
+        A time.BucketIndex built on these dates (e.g. custom bands from
+        BucketIndex.from_edges) can be passed instead of freq, and reused
+        across cashflows sharing the same dates.
+        """
+        if bucket_index is None:
+            assert freq in self.agg_freqs, "Pandas only allows limited frequencies."
+        return self._apply("agg_to_freq", freq=freq, bucket_index=bucket_index)
+
+    @staticmethod
+    def _agg_to_freq(
+        data: CashflowColumns, freq: str | None = None, bucket_index=None
+    ) -> tuple:
+        if bucket_index is None:
+            bucket_index = BucketIndex.from_freq(data.dates, freq)
+        elif not np.array_equal(bucket_index.dates, data.dates.astype("datetime64[D]")):
+            raise ValueError("The bucket index was built on other dates.")
+        cols = list(data.columns)
+        sums = bucket_index.aggregate([data[col] for col in cols]) if cols else []
+        data = CashflowColumns(
+            dates=bucket_index.labels.astype("datetime64[ns]"),
+            columns=dict(zip(cols, sums)),
+        )
         if freq in ["ME", "BME"]:
-            self.freq = "M"
+            schedule_freq = "M"
         elif freq in ["YE", "BYE"]:
-            self.freq = "Y"
+            schedule_freq = "Y"
         elif freq in ["QE", "BQE"]:
-            self.freq = "Q"
+            schedule_freq = "Q"
         elif freq in ["W"]:
-            self.freq = "W"
-        return self
+            schedule_freq = "W"
+        else:
+            schedule_freq = None
+        return data, schedule_freq
 
     # ------------------------------
     # validation
     def _index_is_regular(self):
-        dates = self.data.index
-        freq = det_freq_of_date_range(dates)
-        if freq not in {"M", "S", "Y", "F"}:
-            return False
-        return True
+        return self._freq_is_regular(self.freq)
 
     def _except_irregular_index(self):
-        if not self._index_is_regular():
+        self._except_irregular_freq(self.freq)
+
+    @staticmethod
+    def _freq_is_regular(freq):
+        return freq in {"M", "Q", "S", "Y", "F"}
+
+    @classmethod
+    def _except_irregular_freq(cls, freq):
+        if not cls._freq_is_regular(freq):
             raise ValueError("Irregular index.")
 
     # ------------------------------
     # tax
     @staticmethod
-    def _set_principal_and_interest(df: pd.DataFrame):
-        data = df.copy()
-        initial_value = data["brutto"].values[0]
-        data["principal"] = 0
-        data.loc[data.index.min(), "principal"] = initial_value
-        data.loc[data.index.max(), "principal"] = -initial_value
-        data["interest_paid"] = data["brutto"] - data["principal"]
-        return data
+    def _set_principal_and_interest(data: CashflowColumns) -> CashflowColumns:
+        brutto = data["brutto"]
+        initial_value = brutto[0]
+        principal = np.zeros(len(data))
+        principal[np.argmin(data.dates)] = initial_value
+        principal[np.argmax(data.dates)] = -initial_value
+        return data.with_columns(principal=principal, interest_paid=brutto - principal)
 
-    @staticmethod
-    def _calculat_tax(df: pd.DataFrame):
-        data = df.copy()
-        data["delta_days"] = (data.index - data.index.min()).days
-        data["taxRate"] = data["delta_days"].apply(calc_brazilian_tax_rate)
-        data["tax"] = data["interest_paid"] * data["taxRate"]
-        return data
+    @classmethod
+    def _calculat_tax(
+        cls, data: CashflowColumns, keep=None, table="ir"
+    ) -> CashflowColumns:
+        dates = data.dates.astype("datetime64[D]")
+        delta_days = (dates - dates.min()).astype(np.int64)
+        tax_rate = tax_rates_after_n_days(delta_days, table=table)
+        return cls._with_tax(data, delta_days, tax_rate, keep=keep)
 
-    def tax(self):
-        data = self.data.copy()
-        if ("principal" not in data.columns) and ("interest_paid" not in data.columns):
-            data = self._set_principal_and_interest(data)
-        data = self._calculat_tax(data)
-        data["netto"] = data["brutto"] - data["tax"]
-        self.data = data
-        return self
+    @classmethod
+    def _with_tax(
+        cls, data: CashflowColumns, delta_days, tax_rate, keep=None
+    ) -> CashflowColumns:
+        tax = data["interest_paid"] * tax_rate
+        return cls._with_intermediates(
+            data,
+            keep,
+            intermediates={"delta_days": delta_days, "taxRate": tax_rate},
+            columns={"tax": tax, "netto": data["brutto"] - tax},
+        )
+
+    def tax(self, table="ir"):
+        return self._apply("tax", table=table)
+
+    @classmethod
+    def _tax(cls, data: CashflowColumns, keep=None, table="ir") -> CashflowColumns:
+        if ("principal" not in data) and ("interest_paid" not in data):
+            data = cls._set_principal_and_interest(data)
+        return cls._calculat_tax(data, keep=keep, table=table)
+
+    @classmethod
+    def tax_many(cls, cashflows, table="ir"):
+        """Tax several cashflows with one bracket lookup.
+
+        Each row's holding period is measured from its own cashflow's first
+        date, as in Cashflow.tax.
+        """
+        cashflows = list(cashflows)
+        if not cashflows:
+            return cashflows
+        columns = []
+        for cashflow in cashflows:
+            data = cashflow._own_columns()
+            if ("principal" not in data) and ("interest_paid" not in data):
+                data = cls._set_principal_and_interest(data)
+            columns.append(data)
+
+        lengths = [len(data) for data in columns]
+        dates = np.concatenate([data.dates for data in columns]).astype("datetime64[D]")
+        start_dates = np.repeat([data.dates.min() for data in columns], lengths)
+        delta_days = (dates - start_dates.astype("datetime64[D]")).astype(np.int64)
+        tax_rates = tax_rates_after_n_days(delta_days, table=table)
+
+        splits = np.cumsum(lengths)[:-1]
+        for cashflow, data, days, rates in zip(
+            cashflows,
+            columns,
+            np.split(delta_days, splits),
+            np.split(tax_rates, splits),
+        ):
+            cashflow._set_columns(cls._with_tax(data, days, rates))
+        return cashflows
 
     # ------------------------------
     # valuation
-    def discount_from_constant_rate(self, interest, target):
-        # XXX assumption: regular freq
+    def discount_from_constant_rate(self, interest, target, convention=None):
+        """Discount target to the first date at a constant rate.
 
-        self._except_irregular_index()
-        data = self.data.copy()
-        data[f"{target}_discount_yield"] = interest.value
-        data[f"{target}_discount_yield"] = (
-            data[f"{target}_discount_yield"].shift(1).fillna(0)
+        By default the rate is applied once per row, which assumes a
+        regular index. With a day count convention (see time.year_fraction)
+        the rate is taken as yearly and compounded over the year fraction
+        of each date, which works on any index.
+        """
+        return self._apply(
+            "discount_from_constant_rate",
+            interest=interest,
+            target=target,
+            convention=convention,
+        )
+
+    @classmethod
+    def _discount_from_constant_rate(
+        cls, data: CashflowColumns, interest, target, keep=None, convention=None
+    ) -> CashflowColumns:
+        if convention is not None:
+            interest = interest.convert_to_compound()
+            interest = interest.convert_to_equivalent(new_freq="Y")
+        discount_yield = np.full(len(data), float(interest.value))
+        discount_yield[:1] = 0.0
+        return cls._discount(
+            data, target, discount_yield, keep=keep, convention=convention
         )
-        data[f"{target}_discount_factor"] = (
-            1 / (1 + data[f"{target}_discount_yield"]).cumprod()
+
+    def discount_from_yield_curve(self, discount_curve, target, convention=None):
+        """Discount target with one yield per row, compounding each yield
+        over the period since the previous row; with a convention, yields
+        are yearly and periods are year fractions.
+
+        discount_curve can also be a TermStructure: target is then discounted
+        to the curve's reference date at the curve's discount factor for each
+        date, on any index, and the yields are the curve's zero rates.
+        """
+        if isinstance(discount_curve, TermStructure) and convention is None:
+            convention = discount_curve.convention
+        return self._apply(
+            "discount_from_yield_curve",
+            discount_curve=discount_curve,
+            target=target,
+            convention=convention,
         )
-        data[f"{target}_present_value"] = (
-            data[target] * data[f"{target}_discount_factor"]
+
+    @classmethod
+    def _discount_from_yield_curve(
+        cls, data: CashflowColumns, discount_curve, target, keep=None, convention=None
+    ) -> CashflowColumns:
+        if isinstance(discount_curve, TermStructure):
+            return cls._with_discount(
+                data,
+                target,
+                discount_yield=discount_curve.zero_rates_at(data.dates),
+                discount_factor=discount_curve.discount_factors(data.dates),
+                keep=keep,
+            )
+        discount_yield = np.asarray(discount_curve.values, dtype=np.float64)
+        discount_yield = discount_yield.reshape(-1)
+        if len(discount_yield) != len(data):
+            raise ValueError(
+                f"Discount curve has {len(discount_yield)} rows, but the cashflow has {len(data)}."
+            )
+        return cls._discount(
+            data, target, discount_yield, keep=keep, convention=convention
         )
-        self.data = data
-        return self
 
-    def discount_from_yield_curve(self, discount_curve, target):
-        self._except_irregular_index()
-        data = self.data.copy()
-        data[f"{target}_discount_yield"] = discount_curve.values
-        data[f"{target}_discount_factor"] = (
-            1 / (1 + data[f"{target}_discount_yield"]).cumprod()
+    @classmethod
+    def _discount(
+        cls, data: CashflowColumns, target, discount_yield, keep=None, convention=None
+    ) -> CashflowColumns:
+        if convention is None:
+            discount_factor = 1 / np.cumprod(1 + discount_yield)
+        else:
+            times = year_fraction(
+                start_dates=data.dates.min(),
+                end_dates=data.dates,
+                convention=convention,
+            )
+            delta_times = np.diff(times, prepend=0.0)
+            discount_factor = np.exp(-np.cumsum(delta_times * np.log1p(discount_yield)))
+        return cls._with_discount(
+            data, target, discount_yield, discount_factor, keep=keep
         )
-        data[f"{target}_present_value"] = (
-            data[target] * data[f"{target}_discount_factor"]
+
+    @classmethod
+    def _with_discount(
+        cls, data: CashflowColumns, target, discount_yield, discount_factor, keep=None
+    ) -> CashflowColumns:
+        return cls._with_intermediates(
+            data,
+            keep,
+            intermediates={
+                f"{target}_discount_yield": discount_yield,
+                f"{target}_discount_factor": discount_factor,
+            },
+            columns={f"{target}_present_value": data[target] * discount_factor},
         )
-        self.data = data
-        return self
 
-    def npv(self, target, interest=None):
+    def npv(self, target, interest=None, convention=None):
         if interest is not None:
-            self.discount_from_constant_rate(interest=interest, target=target)
+            self.discount_from_constant_rate(
+                interest=interest, target=target, convention=convention
+            )
         col = f"{target}_present_value"
-        if col not in self.data.columns:
-            raise ValueError(f"Error: '{col} not in columns=={self.data.columns}.")
-        npv = Value(value=self.data[col].sum(), price_date=self.data.index.min())
+        data = self._get_columns()
+        if col not in data:
+            raise ValueError(f"Error: '{col} not in columns=={list(data.columns)}.")
+        price_date = pd.Timestamp(data.dates.min())
+        npv = Value(value=data[col].sum(), price_date=price_date)
         return npv
 
-    def irr(self, target):
+    def npv_grid(self, target, rates) -> np.ndarray:
+        """Present value of target at the first date, for many rates at once.
+
+        rates is either a 1-D array of constant rates per period (as in
+        discount_from_constant_rate) or a (scenarios x periods) array of
+        per-period yields (as in discount_from_yield_curve). Does not
+        change the cashflow.
+        """
         self._except_irregular_index()
-        # XXX get rid of npf
+        values = self._get_columns()[target]
+        return self._discount_factor_grid(rates, len(values)) @ values
+
+    @staticmethod
+    def _discount_factor_grid(rates, n_periods) -> np.ndarray:
+        rates = np.asarray(rates, dtype=np.float64)
+        if rates.ndim <= 1:
+            periods = np.arange(n_periods, dtype=np.float64)
+            return (1 + rates.reshape(-1, 1)) ** -periods
+        if rates.shape[1] != n_periods:
+            raise ValueError(
+                f"Rates have {rates.shape[1]} periods, but the cashflow has {n_periods}."
+            )
+        return 1 / np.cumprod(1 + rates, axis=1)
+
+    def irr(self, target):
+        # irregular schedules fall back to the date-based xirr
+        if self.freq not in months_in_schedule_freq:
+            return self.xirr(target)
+        solution = irr_many(self._get_columns()[target])
         return CompoundInterestRate(
-            value=npf.irr(self.data[target].values),
+            value=solution.rates[0],
             freq=self.freq,
         ).convert_to_equivalent(new_freq="Y")
 
+    def xirr(self, target, convention="ACT/365"):
+        data = self._get_columns()
+        solution = xirr_many(data[target], data.dates, convention=convention)
+        return CompoundInterestRate(value=solution.rates[0], freq="Y")
+
+    # ------------------------------
+    # risk
+    def risk_measures(
+        self, target, interest=None, price_date=None, convention=None
+    ) -> dict[str, float]:
+        measures = self.risk_measures_many(
+            [self],
+            target=target,
+            interest=interest,
+            price_date=price_date,
+            convention=convention,
+        )
+        return {name: float(values[0]) for name, values in measures.items()}
+
+    @classmethod
+    def risk_measures_many(
+        cls, cashflows, target, interest=None, price_date=None, convention=None
+    ) -> dict[str, np.ndarray]:
+        """Duration, convexity and DV01 of the flows after price_date.
+
+        interest is an InterestRate, one per cashflow, or None for each
+        cashflow's xirr, solved on the same year fractions as the measures.
+        price_date defaults to each cashflow's first date.
+        All cashflows are priced in one (cashflows x dates) matrix.
+        """
+        columns = [cashflow._get_columns() for cashflow in cashflows]
+        shape = (len(columns), max(len(data) for data in columns))
+        values = np.zeros(shape)
+        dates = np.full(shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        for row, data in enumerate(columns):
+            values[row, : len(data)] = data[target]
+            dates[row, : len(data)] = data.dates
+        is_padding = np.isnat(dates)
+
+        if price_date is None:
+            last_date = np.datetime64("9999-12-31")
+            price_dates = np.where(is_padding, last_date, dates).min(1)
+        else:
+            price_dates = np.full(len(columns), np.datetime64(price_date, "D"))
+        price_dates = np.broadcast_to(price_dates[:, None], shape)
+        dates = np.where(is_padding, price_dates, dates)
+        if convention is None:
+            times = calculate_delta_years_array(
+                start_dates=price_dates.ravel(), end_dates=dates.ravel()
+            )
+        else:
+            times = year_fraction(
+                start_dates=price_dates.ravel(),
+                end_dates=dates.ravel(),
+                convention=convention,
+            )
+        times = times.reshape(shape)
+
+        if interest is None:
+            # the yield that prices the flows at their cost on these same
+            # times, so measures at the yield are consistent with it
+            yields = solve_rates(values, times).rates
+        else:
+            if isinstance(interest, InterestRate):
+                interest = [interest] * len(columns)
+            yields = np.array(
+                [
+                    rate.convert_to_compound().convert_to_equivalent(new_freq="Y").value
+                    for rate in interest
+                ]
+            )
+        values = np.where(dates > price_dates, values, 0.0)
+        return risk_measures(values, times, yields)
+
     #     def mirr(self, tartget_cols, reinvestment_rate):
     #         # XXX implement
     #         pass
@@ -421,27 +991,70 @@ class Cashflow:
 
     # ------------------------------
     # inflation
-    def deflate_from_constant(self, constant: float, target: str, new_price_date=None):
-        data = self.data.copy()
+    def deflate_from_constant(
+        self, constant: float, target: str, new_price_date=None, convention=None
+    ):
+        return self._apply(
+            "deflate_from_constant",
+            constant=constant,
+            target=target,
+            new_price_date=new_price_date,
+            convention=convention,
+        )
+
+    @classmethod
+    def _deflate_from_constant(
+        cls,
+        data: CashflowColumns,
+        constant: float,
+        target: str,
+        new_price_date=None,
+        convention=None,
+        keep=None,
+    ) -> CashflowColumns:
         if new_price_date is None:
-            new_price_date = self.data.index.min()
+            new_price_date = data.dates.min()
         if isinstance(new_price_date, str):
             new_price_date = datetime.strptime(new_price_date, "%Y-%m-%d")
-        data["delta_years"] = data.index.map(
-            lambda date: calculate_delta_years(start_date=new_price_date, end_date=date)
+        price_date_rows = np.flatnonzero(data.dates == np.datetime64(new_price_date))
+        if len(price_date_rows) == 0:
+            raise KeyError(new_price_date)
+
+        if convention is None:
+            delta_years = calculate_delta_years_array(
+                start_dates=new_price_date, end_dates=data.dates
+            )
+        else:
+            delta_years = year_fraction(
+                start_dates=new_price_date,
+                end_dates=data.dates,
+                convention=convention,
+            )
+        deflator = (1 + constant) ** delta_years
+        deflator /= deflator[price_date_rows[0]]
+        return cls._with_intermediates(
+            data,
+            keep,
+            intermediates={"delta_years": delta_years, "deflator": deflator},
+            columns={f"{target}_deflated": data[target] / deflator},
         )
-        data["deflator"] = (1 + constant) ** data["delta_years"]
-        data["deflator"] /= data["deflator"][new_price_date]
-        data[f"{target}_deflated"] = data[target] / data["deflator"]
-        self.data = data
-        return self
 
     def deflate_from_deflator_curve(self, target, deflator_curve):
-        data = self.data.copy()
-        data["deflator"] = deflator_curve.values
-        data[f"{target}_deflated"] = data[target] / data["deflator"]
-        self.data = data
-        return self
+        return self._apply(
+            "deflate_from_deflator_curve", target=target, deflator_curve=deflator_curve
+        )
+
+    @classmethod
+    def _deflate_from_deflator_curve(
+        cls, data: CashflowColumns, target, deflator_curve, keep=None
+    ) -> CashflowColumns:
+        deflator = np.asarray(deflator_curve.values, dtype=np.float64).reshape(-1)
+        return cls._with_intermediates(
+            data,
+            keep,
+            intermediates={"deflator": deflator},
+            columns={f"{target}_deflated": data[target] / deflator},
+        )
 
     """
     def deflate_from_InflationCuve(self, target, InflationCuve):
@@ -458,56 +1071,95 @@ class Cashflow:
     # -----------------------------------------------------
     # Operations
 
+    @classmethod
+    def sum(cls, cashflows, cols: list[str] | None = None) -> "Cashflow":
+        """Sum cashflows date by date in one pass.
+
+        Columns are the union of the cashflows' columns (in order of first
+        appearance), or cols; a cashflow without a column adds zero to it.
+        Rates, factors and day counts (see is_additive) are left out of the
+        union: summing them means nothing, so they are only summed if listed
+        in cols.
+        """
+        columns = [cashflow._get_columns() for cashflow in cashflows]
+        columns = [data for data in columns if len(data) > 0]
+        if cols is None:
+            cols = list(dict.fromkeys(col for data in columns for col in data.columns))
+            cols = [col for col in cols if is_additive(col)]
+
+        dates = np.concatenate(
+            [data.dates.astype("datetime64[ns]") for data in columns]
+            or [np.array([], dtype="datetime64[ns]")]
+        )
+        unique_dates, rows = np.unique(dates, return_inverse=True)
+        sums = {}
+        for col in cols:
+            values = np.concatenate(
+                [data[col] if col in data else np.zeros(len(data)) for data in columns]
+                or [np.array([])]
+            )
+            sums[col] = np.bincount(rows, weights=values, minlength=len(unique_dates))
+
+        return cls._from_columns(CashflowColumns(dates=unique_dates, columns=sums))
+
     def add_cashflow(self, other_cashflow):
-        df1 = self.data
-        df2 = other_cashflow.data
-        if df1.shape[0] == 0:
-            sum_df = df2
-        elif df2.shape[0] == 0:
-            sum_df = df1
-        else:
-            # XXX which cols to sum?
-            cols = {"brutto", "interest_paid", "principal"}
-            cols = cols.intersection(set(df1.columns), set(df2.columns))
-            cols = list(cols) + ["date"]
-            df1 = df1.reset_index().sort_index(axis=1)[cols]
-            df2 = df2.reset_index().sort_index(axis=1)[cols]
-            assert all(df1.columns == df2.columns)
-            sum_df = pd.concat([df1, df2], axis=0, ignore_index=True)
-            sum_df = sum_df.groupby("date").sum()
-            sum_df = sum_df.sort_index()
-        sum_cf = Cashflow().from_pandas(sum_df)
-        self.cashflow = sum_cf
         # XXX properties
-        return sum_cf
+        return Cashflow.sum([self, other_cashflow])
 
     def __add__(self, other_cashflow):
         return self.add_cashflow(other_cashflow)
 
+    def __radd__(self, other):
+        # lets the builtin sum() start from 0
+        if isinstance(other, int) and other == 0:
+            return Cashflow.sum([self])
+        return NotImplemented
+
     # -----------------------------------------------------
     # Plots
 
-    def _plot_and_annotate(self, label, ax, marker):
-        dates = self.data.index()
-        y = self.data[label]
+    # drawing every point (and every annotation) gets slow and unreadable
+    # on long cashflows: series are decimated to max_points and only the
+    # max_annotations largest values are labelled
+    max_plot_points = 2000
+    max_annotations = 48
+    max_ticks = 36
+
+    def _plot_and_annotate(self, label, ax, marker, max_points, max_annotations):
+        data = self._get_columns()
+        dates = data.dates
+        y = data[label]
+        if len(dates) > max_points:
+            rows = lttb(dates.astype(np.int64), y, max_points)
+            dates, y = dates[rows], y[rows]
+            marker = None
         ax.plot(dates, y, label=label, marker=marker, linestyle="-", markersize=10)
+        self._annotate(ax, dates, y, max_annotations, number_format=",.3f")
+
+    @staticmethod
+    def _annotate(ax, dates, y, max_annotations, number_format):
         rotation = 45 if len(dates) > 12 else 0
-        for date, y in zip(dates, y):
+        for row in top_indices(y, max_annotations):
             ax.annotate(
-                f"{y:,.3f}",
-                (date, y),
+                f"{y[row]:{number_format}}",
+                (dates[row], y[row]),
                 textcoords="offset points",
-                xytext=(0, 20 if y >= 0 else -20),
+                xytext=(0, 20 if y[row] >= 0 else -20),
                 ha="center",
                 rotation=rotation,
             )
 
     def _format_x_axis(self, ax, dates):
         rotation = 45 if len(dates) > 12 else 0
-        date_format = date_format_from_freq(self.freq)
-        ax.set_xticks(dates)
-        plt.xticks(rotation=rotation)
-        ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
+        if len(dates) > self.max_ticks:
+            locator = mdates.AutoDateLocator(maxticks=self.max_ticks)
+            ax.xaxis.set_major_locator(locator)
+            ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        else:
+            ax.set_xticks(dates)
+            date_format = date_format_from_freq(self.freq)
+            ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
+        ax.tick_params(axis="x", labelrotation=rotation)
         ax.set_xlabel("time")
         return ax
 
@@ -517,14 +1169,28 @@ class Cashflow:
         ax.spines["left"].set_visible(False)
         return ax
 
-    def plot_line(self, labels: list[str] | None = None) -> plt.Figure:
-        self._exceptEmpty()
-        labels = self.labels if labels is None else labels
+    def plot_line(
+        self,
+        labels: list[str] | None = None,
+        max_points: int | None = None,
+        max_annotations: int | None = None,
+    ) -> plt.Figure:
+        if len(self._get_columns()) == 0:
+            raise ValueError("Empty cashflow.")
+        labels = self.get_cols() if labels is None else labels
+        max_points = self.max_plot_points if max_points is None else max_points
+        if max_annotations is None:
+            max_annotations = self.max_annotations
         fig, ax = plt.subplots(1, figsize=(18, 12))
-        dates = self.data.index
         for label in labels:
-            self._plot_and_annotate(label=label, ax=ax, marker="o")
-        self._format_x_axis(ax=ax, dates=dates)
+            self._plot_and_annotate(
+                label=label,
+                ax=ax,
+                marker="o",
+                max_points=max_points,
+                max_annotations=max_annotations,
+            )
+        self._format_x_axis(ax=ax, dates=self._get_columns().dates)
         self._format_y_axis(ax=ax)
         ax.grid(True, which="major", linestyle="--", linewidth=0.5)
         fig.set_facecolor("lightgrey")
@@ -533,47 +1199,37 @@ class Cashflow:
 
         return fig
 
-    def plot_arrow(self, targets=list[str]):
+    def plot_arrow(
+        self,
+        targets: list[str],
+        max_points: int | None = None,
+        max_annotations: int | None = None,
+    ) -> plt.Figure:
+        """Arrows from zero to each amount, green for inflows and red for
+        outflows. Above max_points flows, the min and max of each bucket of
+        dates are drawn, so spikes are kept."""
+        max_points = self.max_plot_points if max_points is None else max_points
+        if max_annotations is None:
+            max_annotations = self.max_annotations
         fig, ax = plt.subplots(1, figsize=(18, 12))
+        data = self._get_columns()
 
         for target in targets:
-            dates = self.data.index
-            amounts = self.data[target]
-
-            max_amount = max(abs(amount) for amount in amounts)
-            for date, amount in zip(dates, amounts):
-                if abs(amount) > max_amount / 5:
-                    head_length = max_amount / 10
-                else:
-                    head_length = amount / 2
-
-                arrow_color = "green" if amount >= 0 else "red"
-                ax.arrow(
-                    date,
-                    0,
-                    0,
-                    amount,
-                    color=arrow_color,
-                    width=2,
-                    head_width=5,
-                    head_length=head_length,
-                    length_includes_head=True,
-                    label=target,
-                )
-
-                rotation = 45 if len(dates) > 12 else 0
-
-                ax.annotate(
-                    f"{amount:,.0f}",
-                    (date, amount),
-                    textcoords="offset points",
-                    xytext=(0, 20 if amount >= 0 else -20),
-                    ha="center",
-                    rotation=rotation,
-                )
-
-        # Set x-axis locator and formatter
-        self._format_x_axis(ax, dates)
+            dates = data.dates
+            amounts = data[target]
+            if len(dates) > max_points:
+                rows = min_max_decimate(amounts, max_points // 2)
+                dates, amounts = dates[rows], amounts[rows]
+
+            # one collection for the shafts, one per sign for the heads
+            colors = np.where(amounts >= 0, "green", "red")
+            ax.vlines(dates, 0, amounts, colors=colors, linewidth=2, label=target)
+            for is_inflow, marker, color in [(True, "^", "green"), (False, "v", "red")]:
+                heads = (amounts >= 0) == is_inflow
+                ax.scatter(dates[heads], amounts[heads], marker=marker, color=color)
+            self._annotate(ax, dates, amounts, max_annotations, number_format=",.0f")
+
+        self._format_x_axis(ax, data.dates)
         self._format_y_axis(ax)
         ax.set_title(f"Cashflow - {targets}")
         fig.set_facecolor("lightgrey")
@@ -8,6 +8,7 @@ from interesting.interest import InterestRate
 from interesting.time import (
     datetime_to_string,
     det_freq_of_date_range,
+    parse_date_column,
     same_or_last_date_in_next_month,
 )
 
@@ -29,7 +30,7 @@ class InflationCuve:
     # load data
     def from_json(self, rows):
         data = pd.DataFrame(rows)
-        data["date"] = pd.to_datetime(data["date"])
+        data["date"] = parse_date_column(data["date"])
         data = data.set_index("date")
         self.data = data
         return self
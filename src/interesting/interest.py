@@ -1,8 +1,41 @@
+from functools import lru_cache
+from typing import ClassVar
+
 import numpy as np
 import pandas as pd
 from numpy import diff, e, log
 from pydantic import BaseModel, Field
 
+from .calendars import add_business_days, business_days_between
+from .time import to_datetime64, year_fraction
+
+_set_slot = object.__setattr__
+
+# ----------------------------------------------------------------------
+# equivalent rates
+
+periods_per_year = {"Y": 1, "S": 2, "Q": 4, "M": 12, "D": 360}
+
+# ratio of the periods of freq to the periods of new_freq
+equivalent_ratios = {
+    (freq, new_freq): periods_per_year[freq] / periods_per_year[new_freq]
+    for freq in periods_per_year
+    for new_freq in periods_per_year
+}
+
+
+@lru_cache(maxsize=4096, typed=True)
+def equivalent_value(value: float, freq: str, new_freq: str, regime: str) -> float:
+    """Value of the rate at new_freq, cached: bond constructors convert the
+    same few rates over and over."""
+    assert new_freq in periods_per_year, f"new_freq=={new_freq}"
+    if freq == new_freq:
+        return value
+    ratio = equivalent_ratios[freq, new_freq]
+    if regime == "compound":
+        return (1 + value) ** ratio - 1
+    return ratio * value
+
 
 class InterestRate(BaseModel):
     value: float | int
@@ -14,9 +47,25 @@ class InterestRate(BaseModel):
         pattern=r"^(simple|compound|continuous)$",
     )
 
+    _regime: ClassVar[str | None] = None
+
     def __str__(self):
         return f"InterestRate(value={self.value:.4f}, freq='{self.freq}', regime='{self.regime}')"
 
+    @classmethod
+    def _construct(cls, value, freq: str):
+        # trusted constructor for conversions, whose freq is already valid:
+        # fills the model's slots without validation (model_construct is
+        # slower than validating these three fields)
+        instance = object.__new__(cls)
+        _set_slot(
+            instance, "__dict__", {"value": value, "freq": freq, "regime": cls._regime}
+        )
+        _set_slot(instance, "__pydantic_fields_set__", {"value", "freq", "regime"})
+        _set_slot(instance, "__pydantic_extra__", None)
+        _set_slot(instance, "__pydantic_private__", None)
+        return instance
+
     def __repr__(self):
         return self.__str__()
 
@@ -53,6 +102,7 @@ class InterestRate(BaseModel):
 class CompoundInterestRate(InterestRate):
     value: float | int
     freq: str = Field(..., strip_whitespace=True, to_upper=True, pattern=r"^[YSQMD]$")
+    _regime: ClassVar[str] = "compound"
 
     def __init__(self, value, freq):
         super().__init__(value=value, freq=freq, regime="compound")
@@ -147,11 +197,8 @@ class CompoundInterestRate(InterestRate):
     # conversions
 
     def convert_to_equivalent(self, new_freq=str):
-        freq_ratios = {"Y": 1, "S": 2, "Q": 4, "M": 12, "D": 360}
-        assert new_freq in freq_ratios.keys(), f"new_freq=={new_freq}"
-        ratio = freq_ratios[self.freq] / freq_ratios[new_freq]
-        value = (1 + self.value) ** ratio - 1
-        r_equivalent = CompoundInterestRate(value=value, freq=new_freq)
+        value = equivalent_value(self.value, self.freq, new_freq, "compound")
+        r_equivalent = CompoundInterestRate._construct(value=value, freq=new_freq)
         return r_equivalent
 
     def convert_to_compound(self):
@@ -159,18 +206,19 @@ class CompoundInterestRate(InterestRate):
 
     def convert_to_simple(self):
         value = self.value
-        r_simple = SimpleInterestRate(value=value, freq=self.freq)
+        r_simple = SimpleInterestRate._construct(value=value, freq=self.freq)
         return r_simple
 
     def convert_to_continuous(self):
         value = log(1 + self.value)
-        r_simple = ContinuousInterestRate(value=value, freq=self.freq)
+        r_simple = ContinuousInterestRate._construct(value=value, freq=self.freq)
         return r_simple
 
 
 class SimpleInterestRate(InterestRate):
     value: float | int
     freq: str = Field(..., strip_whitespace=True, to_upper=True, pattern=r"^[YSQMD]$")
+    _regime: ClassVar[str] = "simple"
 
     def __init__(self, value, freq):
         super().__init__(value=value, freq=freq, regime="simple")
@@ -201,16 +249,13 @@ class SimpleInterestRate(InterestRate):
     # -------------------------------------------
     # conversions
     def convert_to_equivalent(self, new_freq=str):
-        freq_ratios = {"Y": 1, "S": 6, "Q": 3, "M": 12, "D": 360}
-        assert new_freq in freq_ratios.keys(), f"new_freq=={new_freq}"
-        ratio = freq_ratios[self.freq] / freq_ratios[new_freq]
-        value = ratio * self.value
-        r_equivalent = SimpleInterestRate(value=value, freq=new_freq)
+        value = equivalent_value(self.value, self.freq, new_freq, "simple")
+        r_equivalent = SimpleInterestRate._construct(value=value, freq=new_freq)
         return r_equivalent
 
     def convert_to_compound(self):
         value = self.value
-        r_compound = CompoundInterestRate(value=value, freq=self.freq)
+        r_compound = CompoundInterestRate._construct(value=value, freq=self.freq)
         return r_compound
 
     def convert_to_simple(self):
@@ -218,7 +263,7 @@ class SimpleInterestRate(InterestRate):
 
     def convert_to_continuous(self):
         value = log(1 + self.value)
-        r_simple = ContinuousInterestRate(value=value, freq=self.freq)
+        r_simple = ContinuousInterestRate._construct(value=value, freq=self.freq)
         return r_simple
 
     def uniform_future_value(
@@ -278,6 +323,7 @@ class SimpleInterestRate(InterestRate):
 class ContinuousInterestRate(InterestRate):
     value: float | int
     freq: str = Field(..., strip_whitespace=True, to_upper=True, pattern=r"^[YSQMD]$")
+    _regime: ClassVar[str] = "continuous"
 
     def __init__(self, value, freq):
         super().__init__(value=value, freq=freq, regime="continuous")
@@ -308,21 +354,18 @@ class ContinuousInterestRate(InterestRate):
     # -------------------------------------------
     # conversions
     def convert_to_equivalent(self, new_freq=str):
-        freq_ratios = {"Y": 1, "S": 6, "Q": 3, "M": 12, "D": 360}
-        assert new_freq in freq_ratios.keys(), f"new_freq=={new_freq}"
-        ratio = freq_ratios[self.freq] / freq_ratios[new_freq]
-        value = ratio * self.value
-        r_equivalent = ContinuousInterestRate(value=value, freq=new_freq)
+        value = equivalent_value(self.value, self.freq, new_freq, "continuous")
+        r_equivalent = ContinuousInterestRate._construct(value=value, freq=new_freq)
         return r_equivalent
 
     def convert_to_compound(self):
         value = e**self.value - 1
-        r_compound = CompoundInterestRate(value=value, freq=self.freq)
+        r_compound = CompoundInterestRate._construct(value=value, freq=self.freq)
         return r_compound
 
     def convert_to_simple(self):
-        value = log(1 + self.value)
-        r_simple = SimpleInterestRate(value=value, freq=self.freq)
+        value = e**self.value - 1
+        r_simple = SimpleInterestRate._construct(value=value, freq=self.freq)
         return r_simple
 
     def convert_to_continuous(self):
@@ -403,6 +446,143 @@ class YearlyContinuousInterestRate(ContinuousInterestRate):
         )
 
 
+# ----------------------------------------------------------------------
+# vectorized rates
+
+rate_classes = {
+    "compound": CompoundInterestRate,
+    "simple": SimpleInterestRate,
+    "continuous": ContinuousInterestRate,
+}
+
+
+class InterestRateArray:
+    """Many rates sharing one freq and regime, backed by a float64 array.
+
+    Conversions and time-travel are elementwise and follow the scalar
+    classes; time-travel broadcasts values against present/future values
+    and delta_time (e.g. delta_time[:, None] gives a times x rates grid).
+    Indexing with an integer returns a scalar rate.
+    """
+
+    __slots__ = ("freq", "regime", "values")
+
+    def __init__(self, values, freq: str, regime: str = "compound"):
+        assert freq in periods_per_year, f"freq=={freq}"
+        assert regime in rate_classes, f"regime=={regime}"
+        self.values = np.asarray(values, dtype=np.float64)
+        self.freq = freq
+        self.regime = regime
+
+    def __str__(self):
+        return (
+            f"InterestRateArray: {len(self)} {self.regime} rates, freq '{self.freq}'."
+        )
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, key):
+        values = self.values[key]
+        if np.ndim(values) == 0:
+            return rate_classes[self.regime]._construct(
+                value=float(values), freq=self.freq
+            )
+        return InterestRateArray(values, freq=self.freq, regime=self.regime)
+
+    def _with_values(self, values, freq=None, regime=None) -> "InterestRateArray":
+        return InterestRateArray(
+            values,
+            freq=self.freq if freq is None else freq,
+            regime=self.regime if regime is None else regime,
+        )
+
+    # -------------------------------------------
+    # scalar rates
+
+    @classmethod
+    def from_rates(
+        cls, rates: list[InterestRate], freq: str | None = None, regime=None
+    ) -> "InterestRateArray":
+        """Rates converted to one freq and regime (by default the first
+        rate's)."""
+        assert len(rates) > 0, "rates must not be empty."
+        freq = rates[0].freq if freq is None else freq
+        regime = rates[0].regime if regime is None else regime
+        values = []
+        for rate in rates:
+            rate = getattr(rate, f"convert_to_{regime}")()
+            if rate.freq != freq:
+                rate = rate.convert_to_equivalent(new_freq=freq)
+            values.append(rate.value)
+        return cls(values, freq=freq, regime=regime)
+
+    def to_rates(self) -> list[InterestRate]:
+        return [self[i] for i in range(len(self))]
+
+    @classmethod
+    def from_equation(
+        cls, present_value, future_value, delta_time, freq: str, regime="compound"
+    ) -> "InterestRateArray":
+        growth = np.asarray(future_value, dtype=np.float64) / present_value
+        if regime == "compound":
+            values = growth ** (1 / np.asarray(delta_time, dtype=np.float64)) - 1
+        elif regime == "simple":
+            values = (growth - 1) / delta_time
+        else:
+            values = np.log(growth) / delta_time
+        return cls(values, freq=freq, regime=regime)
+
+    # -------------------------------------------
+    # time-travel
+
+    def _growth(self, delta_time) -> np.ndarray:
+        delta_time = np.asarray(delta_time, dtype=np.float64)
+        if self.regime == "compound":
+            return (1 + self.values) ** delta_time
+        if self.regime == "simple":
+            return 1 + self.values * delta_time
+        return np.exp(self.values * delta_time)
+
+    def future_value(self, present_value, delta_time) -> np.ndarray:
+        return np.asarray(present_value, dtype=np.float64) * self._growth(delta_time)
+
+    def present_value(self, future_value, delta_time) -> np.ndarray:
+        return np.asarray(future_value, dtype=np.float64) / self._growth(delta_time)
+
+    # -------------------------------------------
+    # conversions
+
+    def convert_to_equivalent(self, new_freq: str) -> "InterestRateArray":
+        assert new_freq in periods_per_year, f"new_freq=={new_freq}"
+        if new_freq == self.freq:
+            return self
+        ratio = equivalent_ratios[self.freq, new_freq]
+        if self.regime == "compound":
+            values = (1 + self.values) ** ratio - 1
+        else:
+            values = self.values * ratio
+        return self._with_values(values, freq=new_freq)
+
+    def convert_to_compound(self) -> "InterestRateArray":
+        if self.regime == "continuous":
+            return self._with_values(np.expm1(self.values), regime="compound")
+        return self._with_values(self.values, regime="compound")
+
+    def convert_to_simple(self) -> "InterestRateArray":
+        if self.regime == "continuous":
+            return self._with_values(np.expm1(self.values), regime="simple")
+        return self._with_values(self.values, regime="simple")
+
+    def convert_to_continuous(self) -> "InterestRateArray":
+        if self.regime == "continuous":
+            return self
+        return self._with_values(np.log1p(self.values), regime="continuous")
+
+
 class InterestRateCurve:
     def __init__(self, yields, regime):
         assert isinstance(
@@ -459,3 +639,209 @@ class InterestRateCurve:
 
     def get_future_value(self, period):
         return self.data.loc[period, "future_value"]
+
+    def to_term_structure(
+        self,
+        dates,
+        reference_date=None,
+        convention: str = "BUS/252",
+        interpolation: str = "flat_forward",
+    ) -> "TermStructure":
+        """Dated curve of these per-period yields: yields[i] accrues over the
+        period ending on dates[i]. Growth is measured from reference_date (by
+        default dates[0]), so yields up to it are not counted."""
+        dates = to_datetime64(dates)
+        assert len(dates) == len(self.data), "One date per yield."
+        reference_date = dates[0] if reference_date is None else reference_date
+        factors = self.calc_acc_yield_factor().data["acc_yield_factor"].to_numpy()
+        start = np.searchsorted(dates, to_datetime64(reference_date), side="right")
+        if start > 0:
+            factors = factors / factors[start - 1]
+        times = year_fraction(reference_date, dates, convention=convention)
+        vertices = times > 0
+        zero_rates = factors[vertices] ** (1 / times[vertices]) - 1
+        return TermStructure(
+            reference_date,
+            dates[vertices],
+            zero_rates,
+            convention=convention,
+            interpolation=interpolation,
+        )
+
+
+# ----------------------------------------------------------------------
+# term structure
+
+interpolations = ["flat_forward", "linear_zero", "monotone_cubic"]
+
+
+class TermStructure:
+    """Yearly compound zero rates at vertex dates, as of reference_date.
+
+    Times are year fractions under convention (business days over 252 on
+    calendar, the ANBIMA one by default). Between vertices:
+    - flat_forward: log discount factors are linear in time (constant
+      forward rates), the last forward extends past the last vertex;
+    - linear_zero: continuous zero rates are linear in time, flat outside;
+    - monotone_cubic: monotone (Fritsch-Carlson) cubic on log discount
+      factors, linear beyond the ends.
+    Dates before reference_date extrapolate the first segment.
+    """
+
+    __slots__ = (
+        "_log_factors",
+        "_slopes",
+        "_times",
+        "calendar",
+        "convention",
+        "dates",
+        "interpolation",
+        "reference_date",
+        "zero_rates",
+    )
+
+    def __init__(
+        self,
+        reference_date,
+        dates,
+        zero_rates,
+        convention: str = "BUS/252",
+        interpolation: str = "flat_forward",
+        calendar=None,
+    ):
+        if interpolation not in interpolations:
+            raise ValueError(
+                f"interpolation=={interpolation}, but must be one of {interpolations}."
+            )
+        self.reference_date = to_datetime64(reference_date)[()]
+        self.dates = to_datetime64(dates)
+        self.zero_rates = np.asarray(zero_rates, dtype=np.float64)
+        self.convention = convention
+        self.interpolation = interpolation
+        self.calendar = calendar
+        assert len(self.dates) > 0, "A curve needs at least one vertex."
+        assert len(self.dates) == len(self.zero_rates), "One zero rate per date."
+        assert np.all(np.diff(self.dates) > np.timedelta64(0)), (
+            "Vertex dates must be increasing."
+        )
+        assert self.dates[0] > self.reference_date, (
+            "Vertex dates must be after the reference date."
+        )
+
+        # knots at time 0 and at every vertex
+        times = self.times(self.dates)
+        self._times = np.concatenate([[0.0], times])
+        self._log_factors = np.concatenate([[0.0], -times * np.log1p(self.zero_rates)])
+        if interpolation == "monotone_cubic":
+            self._slopes = _monotone_slopes(self._times, self._log_factors)
+        else:
+            self._slopes = None
+
+    def __str__(self):
+        return f"TermStructure: {len(self.dates)} vertices from {self.reference_date}, {self.interpolation} on {self.convention}."
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def from_business_days(
+        cls,
+        reference_date,
+        business_days,
+        zero_rates,
+        interpolation: str = "flat_forward",
+        calendar=None,
+    ) -> "TermStructure":
+        """Vertices given as business days after reference_date (BUS/252)."""
+        dates = add_business_days(reference_date, business_days, calendar=calendar)
+        return cls(
+            reference_date,
+            dates,
+            zero_rates,
+            convention="BUS/252",
+            interpolation=interpolation,
+            calendar=calendar,
+        )
+
+    def times(self, dates) -> np.ndarray:
+        if self.convention == "BUS/252" and self.calendar is not None:
+            delta_days = business_days_between(
+                self.reference_date, dates, calendar=self.calendar
+            )
+            return np.asarray(delta_days, dtype=np.float64) / 252
+        return year_fraction(self.reference_date, dates, convention=self.convention)
+
+    # -------------------------------------------
+    # evaluation
+
+    def _log_discount_factors(self, times) -> np.ndarray:
+        knots, log_factors = self._times, self._log_factors
+        if self.interpolation == "linear_zero":
+            # continuous zero rates, flat before the first vertex
+            zero_rates = np.interp(times, knots[1:], -log_factors[1:] / knots[1:])
+            return -times * zero_rates
+
+        segment = np.clip(
+            np.searchsorted(knots, times, side="right") - 1, 0, len(knots) - 2
+        )
+        start, end = knots[segment], knots[segment + 1]
+        width = end - start
+        forwards = (log_factors[segment + 1] - log_factors[segment]) / width
+        linear = log_factors[segment] + (times - start) * forwards
+        if self.interpolation == "flat_forward":
+            return linear
+
+        s = (times - start) / width
+        inside = (s >= 0) & (s <= 1)
+        s = np.clip(s, 0, 1)
+        cubic = (
+            (2 * s**3 - 3 * s**2 + 1) * log_factors[segment]
+            + (s**3 - 2 * s**2 + s) * width * self._slopes[segment]
+            + (-2 * s**3 + 3 * s**2) * log_factors[segment + 1]
+            + (s**3 - s**2) * width * self._slopes[segment + 1]
+        )
+        # beyond the ends: continue with the end slope
+        before = log_factors[0] + (times - knots[0]) * self._slopes[0]
+        after = log_factors[-1] + (times - knots[-1]) * self._slopes[-1]
+        return np.where(inside, cubic, np.where(times < knots[0], before, after))
+
+    def discount_factors(self, dates) -> np.ndarray:
+        return np.exp(self._log_discount_factors(self.times(dates)))
+
+    def zero_rates_at(self, dates) -> np.ndarray:
+        """Yearly compound zero rates at dates (the first vertex's rate on
+        the reference date)."""
+        times = self.times(dates)
+        log_factors = self._log_discount_factors(times)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            zero_rates = np.expm1(-log_factors / times)
+        return np.where(times == 0, self.zero_rates[0], zero_rates)
+
+
+def _monotone_slopes(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # Fritsch-Carlson derivatives at the knots, with the three-point end
+    # conditions used by PCHIP
+    h = np.diff(x)
+    delta = np.diff(y) / h
+    if len(h) == 1:
+        return np.full(2, delta[0])
+
+    slopes = np.zeros(len(x))
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    same_sign = delta[:-1] * delta[1:] > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        harmonic = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+    slopes[1:-1] = np.where(same_sign, harmonic, 0.0)
+    slopes[0] = _end_slope(h[0], h[1], delta[0], delta[1])
+    slopes[-1] = _end_slope(h[-1], h[-2], delta[-1], delta[-2])
+    return slopes
+
+
+def _end_slope(h0, h1, delta0, delta1) -> float:
+    slope = ((2 * h0 + h1) * delta0 - h0 * delta1) / (h0 + h1)
+    if np.sign(slope) != np.sign(delta0):
+        return 0.0
+    if np.sign(delta0) != np.sign(delta1) and abs(slope) > abs(3 * delta0):
+        return 3 * delta0
+    return slope
@@ -0,0 +1,59 @@
+import numpy as np
+
+# ----------------------------------------------------------------------
+# decimation
+
+# Both functions return sorted indices of the points to draw, so any
+# column sharing the x values can be decimated the same way.
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """Largest-triangle-three-buckets: keep n_out points that preserve the
+    visual shape of the series (first and last points always kept)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # average of the next bucket (the last point for the last bucket)
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        indices[bucket + 1] = previous
+    return indices
+
+
+def min_max_decimate(y, n_buckets: int) -> np.ndarray:
+    """Keep the minimum and the maximum of each of n_buckets equal-size
+    buckets, so spikes survive decimation."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+
+    buckets = np.arange(n) * n_buckets // n
+    order = np.lexsort((y, buckets))
+    starts = np.searchsorted(buckets[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+def top_indices(y, n_top: int) -> np.ndarray:
+    """Sorted indices of the n_top values with the largest magnitude."""
+    y = np.asarray(y, dtype=np.float64)
+    if n_top >= len(y):
+        return np.arange(len(y))
+    return np.sort(np.argpartition(-np.abs(y), n_top)[:n_top])
@@ -1,10 +1,23 @@
+import json
 from datetime import datetime
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from matplotlib.ticker import FuncFormatter
 
-from .cashflow import Cashflow
+from .bonds import Bond
+from .cashflow import Cashflow, CashflowColumns
+from .storage import (
+    read_arrow,
+    read_parquet,
+    table_metadata,
+    with_metadata,
+    write_arrow,
+    write_parquet,
+)
+from .time import BucketIndex
 from .utils import thousand_separator
 
 figsize_medium = (18, 12)
@@ -13,7 +26,7 @@ figsize_medium = (18, 12)
 class Portfolio:
     def __init__(self):
         self.bonds = []
-        self.total_cashflow = Cashflow()
+        self._total_cashflow = None
 
     def __str__(self):
         return f"Portfolio: {len(self.bonds)} Cashflows."
@@ -29,21 +42,112 @@ class Portfolio:
                 )
             )
         new_portfolio = Portfolio()
-        new_portfolio.bonds = self.bonds + other.bonds
-        new_portfolio.total_cashflow = self.total_cashflow + other.total_cashflow
+        new_portfolio.add_bond(self.bonds + other.bonds)
         return new_portfolio
 
+    @property
+    def total_cashflow(self) -> Cashflow:
+        # summed once on demand, not on every add_bond
+        if self._total_cashflow is None:
+            self._total_cashflow = Cashflow.sum(self.bonds)
+        return self._total_cashflow
+
+    @total_cashflow.setter
+    def total_cashflow(self, cashflow: Cashflow):
+        self._total_cashflow = cashflow
+
     # ------------------------------
     # add data
     def add_bond(self, bond):
         if isinstance(bond, list):
             self.bonds.extend(bond)
-            self.total_cashflow += bond
         else:
             self.bonds.append(bond)
-        self.total_cashflow += bond
+        self._total_cashflow = None
         return self
 
+    # ------------------------------
+    # persistence
+
+    # The whole book is one table, the bonds' rows one after the other.
+    # Each bond's row offset and metadata (with its class and columns) are
+    # kept in the schema metadata, so from_arrow only slices views of the
+    # mapped columns.
+
+    def to_arrow_table(self) -> pa.Table:
+        columns = [bond._get_columns() for bond in self.bonds]
+        names = list(dict.fromkeys(col for data in columns for col in data.columns))
+        empty = [np.array([], dtype="datetime64[ns]")]
+        table = CashflowColumns(
+            dates=np.concatenate(empty + [data.dates for data in columns]),
+            columns={
+                col: np.concatenate(
+                    [np.array([])]
+                    + [
+                        data[col] if col in data else np.full(len(data), np.nan)
+                        for data in columns
+                    ]
+                )
+                for col in names
+            },
+        ).to_arrow()
+        # bonds mostly share their metadata: store each distinct record once
+        records = {}
+        kinds = []
+        for bond, data in zip(self.bonds, columns):
+            record = {
+                **bond._arrow_metadata(),
+                "class": type(bond).__name__,
+                "columns": list(data.columns),
+            }
+            kinds.append(records.setdefault(json.dumps(record), len(records)))
+        metadata = {
+            "offsets": np.cumsum([0] + [len(data) for data in columns]).tolist(),
+            "kinds": kinds,
+            "records": [json.loads(record) for record in records],
+        }
+        return with_metadata(table, metadata)
+
+    @classmethod
+    def from_arrow_table(cls, table: pa.Table):
+        metadata = table_metadata(table)
+        data = CashflowColumns.from_arrow(table)
+        classes = _cashflow_classes(Cashflow)
+        records = metadata["records"]
+        for record in records:
+            default = Bond if "bond" in record else Cashflow
+            record["class"] = classes.get(record["class"], default)
+        offsets = metadata["offsets"]
+        bounds = list(zip(offsets[:-1], offsets[1:]))
+        # views of every column for every bond, a column at a time
+        views = {
+            col: [values[start:end] for start, end in bounds]
+            for col, values in [("date", data.dates), *data.columns.items()]
+        }
+        bonds = []
+        for i, kind in enumerate(metadata["kinds"]):
+            record = records[kind]
+            columns = CashflowColumns(
+                dates=views["date"][i],
+                columns={col: views[col][i] for col in record["columns"]},
+            )
+            bonds.append(record["class"]._from_arrow_metadata(columns, record))
+        return cls().add_bond(bonds)
+
+    def to_arrow(self, path):
+        write_arrow(self.to_arrow_table(), path)
+
+    @classmethod
+    def from_arrow(cls, path):
+        return cls.from_arrow_table(read_arrow(path))
+
+    def to_parquet(self, path, **kwargs):
+        write_parquet(self.to_arrow_table(), path, **kwargs)
+
+    @classmethod
+    def from_parquet(cls, path):
+        return cls.from_arrow_table(read_parquet(path))
+
     # ------------------------------
     # query data
 
@@ -91,10 +195,7 @@ class Portfolio:
 
         bonds_by_property_agg = {}
         for property in bonds_by_property.keys():
-            cf = Cashflow()
-            for bond in bonds_by_property[property]:
-                cf += bond
-            bonds_by_property_agg[property] = cf
+            bonds_by_property_agg[property] = Cashflow.sum(bonds_by_property[property])
 
         data = {}
         for property in bonds_by_property_agg.keys():
@@ -108,6 +209,37 @@ class Portfolio:
             data[property] = sum(df_subset)
         return data
 
+    def agg_to_freq(
+        self, freq: str | None = None, target: str = "brutto", edges=None, labels=None
+    ) -> pd.DataFrame:
+        """target of every bond summed by freq bucket, or by custom bands
+        (see BucketIndex.from_edges), as a (buckets x bonds) frame. Bonds
+        are labeled by their position in self.bonds, as names repeat.
+
+        All bonds share one bucket index over the union of their dates, and
+        every row goes straight to its (bond, bucket) cell in one bincount.
+        """
+        columns = [bond._get_columns() for bond in self.bonds]
+        dates = np.concatenate([data.dates for data in columns])
+        dates, positions = np.unique(dates, return_inverse=True)
+        rows = np.repeat(np.arange(len(columns)), [len(data) for data in columns])
+
+        if edges is None:
+            bucket_index = BucketIndex.from_freq(dates, freq)
+        else:
+            bucket_index = BucketIndex.from_edges(dates, edges, labels=labels)
+        n_buckets = len(bucket_index)
+        values = np.bincount(
+            rows * n_buckets + bucket_index.bucket_ids[positions],
+            weights=np.concatenate([data[target] for data in columns]),
+            minlength=len(columns) * n_buckets,
+        ).reshape(len(columns), n_buckets)
+        return pd.DataFrame(
+            values.T,
+            index=pd.Index(bucket_index.labels, name="date"),
+            columns=pd.RangeIndex(len(self.bonds), name="bond"),
+        )
+
     def group_by_year(self) -> dict[str, float]:
         list_of_dfs = [bond.data.reset_index() for bond in self.bonds]
         df = pd.concat(list_of_dfs, axis=0, ignore_index=True)
@@ -115,9 +247,30 @@ class Portfolio:
         df = df.drop(columns=["date"]).groupby(["year"]).sum()
         return df
 
+    # ------------------------------
+    # tax
+    def tax(self, table="ir"):
+        # every bond is taxed from its own start date, in one batch
+        Cashflow.tax_many(self.bonds, table=table)
+        self._total_cashflow = None
+        return self
+
     # ------------------------------
     # XXX discount and valuation
 
+    def risk_measures(
+        self, target="brutto", interest=None, price_date=None, convention=None
+    ) -> pd.DataFrame:
+        measures = Cashflow.risk_measures_many(
+            self.bonds,
+            target=target,
+            interest=interest,
+            price_date=price_date,
+            convention=convention,
+        )
+        # by position in self.bonds, as names repeat
+        return pd.DataFrame(measures, index=pd.RangeIndex(len(self.bonds), name="bond"))
+
     # ------------------------------
     # plot
     @staticmethod
@@ -187,3 +340,10 @@ class Portfolio:
         return fgc_portfolio.plot_target_by_property(
             target=target, property="year", graph="bar"
         )
+
+
+def _cashflow_classes(cls) -> dict:
+    classes = {cls.__name__: cls}
+    for subclass in cls.__subclasses__():
+        classes.update(_cashflow_classes(subclass))
+    return classes
@@ -0,0 +1,32 @@
+import numpy as np
+
+# ----------------------------------------------------------------------
+# rate sensitivities
+
+basis_point = 0.0001
+
+
+def risk_measures(values, times, yields) -> dict[str, np.ndarray]:
+    """Closed-form rate sensitivities of each row of a (positions x flows)
+    array paid at times (in years), at annual compound yields.
+
+    Padding flows should be zero.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    times = np.broadcast_to(np.asarray(times, dtype=np.float64), values.shape)
+    growth = 1 + np.asarray(yields, dtype=np.float64).reshape(-1, 1)
+
+    discounted = values * growth**-times
+    present_value = discounted.sum(1)
+    macaulay_duration = (times * discounted).sum(1) / present_value
+    modified_duration = macaulay_duration / growth[:, 0]
+    convexity = (times * (times + 1) * discounted).sum(1) / (
+        present_value * growth[:, 0] ** 2
+    )
+    return {
+        "present_value": present_value,
+        "macaulay_duration": macaulay_duration,
+        "modified_duration": modified_duration,
+        "convexity": convexity,
+        "dv01": modified_duration * present_value * basis_point,
+    }
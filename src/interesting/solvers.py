@@ -0,0 +1,240 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .time import year_fraction
+
+# ----------------------------------------------------------------------
+# internal rate of return
+
+# rates scanned for sign changes, for flows that can have several rates
+# and when newton does not converge: every 1% from -90% to 100%, coarser
+# outside. Rates closer together than a step can be missed.
+bracket_rates = np.concatenate(
+    [[-0.999, -0.99, -0.95], np.arange(-90, 100) / 100, [1.0, 1.5, 2.0, 3.0, 5.0, 10.0]]
+)
+
+
+# step halvings per newton iteration before a row is left to brent
+max_halvings = 30
+
+
+class RateSolution(NamedTuple):
+    rates: np.ndarray
+    converged: np.ndarray
+    iterations: np.ndarray
+
+
+def irr_many(values, guess=0.0, tol=1e-12, maxiter=100) -> RateSolution:
+    """IRR per period of each row of a (positions x periods) array.
+
+    Shorter cashflows can be padded with zeros.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    times = np.arange(values.shape[1], dtype=np.float64)
+    return solve_rates(values, times, guess=guess, tol=tol, maxiter=maxiter)
+
+
+def xirr_many(
+    values, dates, convention="ACT/365", guess=0.0, tol=1e-12, maxiter=100
+) -> RateSolution:
+    """Annual IRR of each row of a (positions x flows) array paid on dates.
+
+    Times are year fractions from each row's first date. Padding dates may
+    be NaT.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    dates = np.atleast_2d(np.asarray(dates, dtype="datetime64[D]"))
+    assert dates.shape == values.shape, "values and dates must have the same shape."
+    is_padding = np.isnat(dates)
+    start_dates = np.min(np.where(is_padding, np.datetime64("9999-12-31"), dates), 1)
+    dates = np.where(is_padding, start_dates[:, None], dates)
+    times = year_fraction(
+        start_dates=np.broadcast_to(start_dates[:, None], dates.shape).ravel(),
+        end_dates=dates.ravel(),
+        convention=convention,
+    ).reshape(dates.shape)
+    values = np.where(is_padding, 0.0, values)
+    return solve_rates(values, times, guess=guess, tol=tol, maxiter=maxiter)
+
+
+def solve_rates(values, times, guess=0.0, tol=1e-12, maxiter=100) -> RateSolution:
+    """Solve sum(values / (1 + rate) ** times) == 0 for each row.
+
+    Flows that change sign once in time order have a single rate, found by
+    newton on all rows at once, from guess, halving the step while it
+    overflows or does not reduce |npv|. Flows with several sign changes
+    can have several rates: as numpy_financial.irr, the one closest to zero
+    is returned, solving with brent the sign change of bracket_rates
+    nearest to zero on each side. Newton failures take the same path, and
+    multi-sign rows without a sign change on bracket_rates go to newton.
+    Rows without both inflows and outflows have no rate and are reported as
+    not converged (nan).
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    times = np.broadcast_to(np.asarray(times, dtype=np.float64), values.shape)
+    n_rows = values.shape[0]
+
+    rates = np.full(n_rows, float(guess))
+    converged = np.zeros(n_rows, dtype=bool)
+    iterations = np.zeros(n_rows, dtype=np.int64)
+    has_root = np.any(values > 0, 1) & np.any(values < 0, 1)
+
+    for row in np.flatnonzero(has_root & (_sign_changes(values, times) > 1)):
+        rate, n_iterations = _closest_rate(values[row], times[row], tol, maxiter)
+        rates[row] = rate if np.isfinite(rate) else guess
+        converged[row] = np.isfinite(rate)
+        iterations[row] += n_iterations
+
+    active = has_root & ~converged
+    npv = np.full(n_rows, np.nan)
+    derivative = np.full(n_rows, np.nan)
+    rows = np.flatnonzero(active)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        npv[rows], derivative[rows] = _npv_and_derivative(
+            values[rows], times[rows], rates[rows]
+        )
+    for _ in range(maxiter):
+        rows = np.flatnonzero(active)
+        if len(rows) == 0:
+            break
+        with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+            new_rates = rates[rows] - npv[rows] / derivative[rows]
+            # keep 1 + rate positive: go halfway to -1 instead of past it
+            below = new_rates <= -1
+            new_rates[below] = (rates[rows][below] - 1) / 2
+            new_npv, new_derivative = _npv_and_derivative(
+                values[rows], times[rows], new_rates
+            )
+            # backtrack: halve the step while the npv overflows or grows
+            halved = np.zeros(len(rows), dtype=bool)
+            for _ in range(max_halvings):
+                worse = ~(np.abs(new_npv) <= np.abs(npv[rows])) & (
+                    np.abs(new_rates - rates[rows]) > tol * (1 + np.abs(rates[rows]))
+                )
+                if not worse.any():
+                    break
+                halved |= worse
+                new_rates[worse] = (rates[rows][worse] + new_rates[worse]) / 2
+                new_npv[worse], new_derivative[worse] = _npv_and_derivative(
+                    values[rows[worse]], times[rows[worse]], new_rates[worse]
+                )
+        small = np.abs(new_rates - rates[rows]) <= tol * (1 + np.abs(rates[rows]))
+        # a step halved down to tol stalled away from the rate
+        failed = ~(np.isfinite(new_rates) & np.isfinite(new_npv)) | (small & halved)
+        done = ~failed & small
+        kept = rows[~failed]
+        rates[kept] = new_rates[~failed]
+        npv[kept] = new_npv[~failed]
+        derivative[kept] = new_derivative[~failed]
+        iterations[rows] += 1
+        converged[rows[done]] = True
+        active[rows[done | failed]] = False
+
+    for row in np.flatnonzero(has_root & ~converged):
+        rate, n_iterations = _closest_rate(values[row], times[row], tol, maxiter)
+        rates[row] = rate
+        converged[row] = np.isfinite(rate)
+        iterations[row] += n_iterations
+
+    rates[~converged] = np.nan
+    return RateSolution(rates=rates, converged=converged, iterations=iterations)
+
+
+def _sign_changes(values, times) -> np.ndarray:
+    # sign changes of each row in time order, skipping zeros: an upper bound
+    # on the number of rates (Descartes' rule of signs)
+    order = np.argsort(times, axis=1, kind="stable")
+    signs = np.sign(np.take_along_axis(values, order, axis=1))
+    # carry the last nonzero sign over zeros
+    last_nonzero = np.where(signs != 0, np.arange(signs.shape[1]), 0)
+    np.maximum.accumulate(last_nonzero, axis=1, out=last_nonzero)
+    signs = np.take_along_axis(signs, last_nonzero, axis=1)
+    return np.sum(signs[:, 1:] * signs[:, :-1] < 0, axis=1)
+
+
+def _npv_and_derivative(values, times, rates) -> tuple:
+    growth = 1 + rates[:, None]
+    discounted = values * growth**-times
+    npv = discounted.sum(1)
+    derivative = -(times * discounted).sum(1) / growth[:, 0]
+    return npv, derivative
+
+
+def _npv(values, times, rate) -> float:
+    return float(np.sum(values * (1 + rate) ** -times))
+
+
+def _closest_rate(values, times, tol, maxiter) -> tuple:
+    # the rate closest to zero: brent in the sign change of bracket_rates
+    # nearest to zero below it and above it, keeping the smaller rate
+    with np.errstate(over="ignore", invalid="ignore"):
+        npvs = (values * (1 + bracket_rates[:, None]) ** -times).sum(1)
+    changes = np.flatnonzero(np.sign(npvs[:-1]) * np.sign(npvs[1:]) <= 0)
+    below = changes[bracket_rates[changes + 1] <= 0]
+    above = changes[bracket_rates[changes] >= 0]
+    candidates = [*below[-1:], *above[:1]]
+
+    best_rate, n_iterations = np.nan, 0
+    for i in candidates:
+        rate, iterations = brent(
+            lambda rate: _npv(values, times, rate),
+            bracket_rates[i],
+            bracket_rates[i + 1],
+            tol=tol,
+            maxiter=maxiter,
+        )
+        n_iterations += iterations
+        if np.isfinite(rate) and (np.isnan(best_rate) or abs(rate) < abs(best_rate)):
+            best_rate = rate
+    return best_rate, n_iterations
+
+
+def brent(f, a, b, tol=1e-12, maxiter=100) -> tuple:
+    """Root of f in [a, b], where f(a) and f(b) have opposite signs.
+
+    Returns the root and the number of iterations; nan if there is no
+    sign change or it does not converge.
+    """
+    fa, fb = f(a), f(b)
+    if fa == 0:
+        return a, 0
+    if fb == 0:
+        return b, 0
+    if fa * fb > 0:
+        return np.nan, 0
+    c, fc = b, fb
+    d = e = b - a
+    for iteration in range(1, maxiter + 1):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol1 = 2 * np.finfo(float).eps * abs(b) + tol / 2
+        m = (c - b) / 2
+        if abs(m) <= tol1 or fb == 0:
+            return b, iteration
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            # inverse quadratic interpolation, or secant if a == c
+            s = fb / fa
+            if a == c:
+                p, q = 2 * m * s, 1 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * m * q - abs(tol1 * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        a, fa = b, fb
+        b += d if abs(d) > tol1 else np.copysign(tol1, m)
+        fb = f(b)
+    return np.nan, maxiter
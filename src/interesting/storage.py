@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ----------------------------------------------------------------------
+# arrow tables
+
+# Library metadata (freq, bond attributes, ...) is stored as JSON under
+# this key of the schema metadata.
+metadata_key = b"interesting"
+
+
+def with_metadata(table: pa.Table, metadata: dict) -> pa.Table:
+    return table.replace_schema_metadata({metadata_key: json.dumps(metadata)})
+
+
+def table_metadata(table: pa.Table) -> dict:
+    metadata = table.schema.metadata or {}
+    if metadata_key not in metadata:
+        return {}
+    return json.loads(metadata[metadata_key])
+
+
+def column_to_numpy(table: pa.Table, name: str) -> np.ndarray:
+    """A numpy view of a column: no copy for a single chunk of a primitive
+    type without nulls, as written by write_arrow. Views are read-only."""
+    column = table.column(name)
+    array = column.chunks[0] if column.num_chunks == 1 else column.combine_chunks()
+    return array.to_numpy(zero_copy_only=False)
+
+
+# ----------------------------------------------------------------------
+# files
+
+
+def write_arrow(table: pa.Table, path):
+    # a single record batch, so every column maps to one contiguous buffer
+    with (
+        pa.OSFile(str(path), "wb") as sink,
+        pa.ipc.new_file(sink, table.schema) as writer,
+    ):
+        writer.write_table(table, max_chunksize=max(len(table), 1))
+
+
+def read_arrow(path, memory_map: bool = True) -> pa.Table:
+    """Memory-map an Arrow IPC file: pages are read on first access and the
+    table's buffers point into the mapping. The mapping keeps its file open,
+    so many small files are better read into memory (memory_map=False)."""
+    if memory_map:
+        return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    with open(path, "rb") as source:
+        return pa.ipc.open_file(pa.py_buffer(source.read())).read_all()
+
+
+def write_parquet(table: pa.Table, path, **kwargs):
+    pq.write_table(table, str(path), **kwargs)
+
+
+def read_parquet(path) -> pa.Table:
+    return pq.read_table(str(path), memory_map=True)
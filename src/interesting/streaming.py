@@ -0,0 +1,239 @@
+import numpy as np
+import pandas as pd
+
+from .cashflow import Cashflow, CashflowColumns
+from .time import calculate_delta_years_array, schedule_cache, year_fraction
+from .utils import tax_rates_after_n_days
+from .value import Value
+
+
+class CashflowStream:
+    """A cashflow produced and transformed in fixed-size chunks of dates.
+
+    Stages (tax, deflate_from_constant, discount_from_constant_rate) are
+    applied chunk by chunk as the stream is iterated, and reductions
+    (totals, npv, agg_to_freq) consume it incrementally, so memory depends
+    on chunk_size rather than on the horizon. Stages return a new stream;
+    the chunks are regenerated on every pass.
+    """
+
+    def __init__(self, chunks, stages=(), keep=None):
+        # chunks: callable returning an iterator of CashflowColumns
+        self._chunks = chunks
+        self._stages = tuple(stages)
+        self._keep = keep
+
+    def __str__(self):
+        stages = ", ".join(step for step, _ in self._stages) or "none"
+        return f"CashflowStream: stages {stages}."
+
+    def __repr__(self):
+        return self.__str__()
+
+    # ------------------------------
+    # sources
+
+    @classmethod
+    def from_cashflow(cls, cashflow: Cashflow, chunk_size: int = 4096):
+        # chunks outlive the call: don't share arrays with a handed-out .data
+        data = cashflow._own_columns()
+
+        def chunks():
+            for start in range(0, len(data), chunk_size):
+                rows = slice(start, start + chunk_size)
+                yield CashflowColumns(
+                    dates=data.dates[rows],
+                    columns={col: data[col][rows] for col in data.columns},
+                )
+
+        return cls(chunks)
+
+    @classmethod
+    def from_regular_pmt(
+        cls,
+        pmt_amount,
+        freq,
+        start_date,
+        end_date,
+        chunk_size: int = 4096,
+        initial_capital_pmt=0,
+        final_capital_pmt=0,
+        gradient_yield=0.0,
+        gradient_amount=0.0,
+    ):
+        """Stream of Cashflow.from_regular_pmt, with freq "D" for daily
+        payments; daily dates are generated one chunk at a time."""
+        start_date = np.datetime64(start_date, "D")
+        end_date = np.datetime64(end_date, "D")
+        if freq == "D":
+            n_dates = int((end_date - start_date).astype(np.int64)) + 1
+            schedule = None
+        else:
+            schedule = schedule_cache.get(start_date, end_date, freq)
+            n_dates = len(schedule)
+
+        def chunks():
+            for start in range(0, n_dates, chunk_size):
+                rows = np.arange(start, min(start + chunk_size, n_dates))
+                if schedule is None:
+                    dates = start_date + rows
+                else:
+                    dates = schedule[rows]
+                periods = rows - 1
+                if gradient_yield != 0.0:
+                    pmts = pmt_amount * (1 + gradient_yield) ** periods
+                else:
+                    pmts = pmt_amount + gradient_amount * periods
+                interest_paid = np.where(rows == 0, 0.0, pmts)
+                principal = np.zeros(len(rows))
+                principal[rows == 0] = initial_capital_pmt
+                principal[rows == n_dates - 1] = final_capital_pmt
+                yield CashflowColumns(
+                    dates=dates.astype("datetime64[ns]"),
+                    columns={
+                        "interest_paid": interest_paid,
+                        "principal": principal,
+                        "brutto": principal + interest_paid,
+                    },
+                )
+
+        return cls(chunks)
+
+    # ------------------------------
+    # iteration
+
+    def __iter__(self):
+        first_date = None
+        first_row = 0
+        for chunk in self._chunks():
+            if first_date is None:
+                first_date = chunk.dates[0]
+            for step, kwargs in self._stages:
+                chunk = getattr(self, f"_{step}")(
+                    chunk,
+                    first_date=first_date,
+                    first_row=first_row,
+                    keep=self._keep,
+                    **kwargs,
+                )
+            first_row += len(chunk)
+            yield chunk
+
+    def _with_stage(self, step: str, **kwargs) -> "CashflowStream":
+        stages = self._stages + ((step, kwargs),)
+        return CashflowStream(self._chunks, stages=stages, keep=self._keep)
+
+    # ------------------------------
+    # stages
+
+    def tax(self, table="ir"):
+        return self._with_stage("tax", table=table)
+
+    @staticmethod
+    def _tax(chunk, first_date, first_row, keep, table) -> CashflowColumns:
+        if "interest_paid" not in chunk:
+            raise ValueError("Streaming tax needs an 'interest_paid' column.")
+        delta_days = (
+            chunk.dates.astype("datetime64[D]") - first_date.astype("datetime64[D]")
+        ).astype(np.int64)
+        tax_rate = tax_rates_after_n_days(delta_days, table=table)
+        return Cashflow._with_tax(chunk, delta_days, tax_rate, keep=keep)
+
+    def deflate_from_constant(
+        self, constant: float, target: str, new_price_date=None, convention=None
+    ):
+        return self._with_stage(
+            "deflate_from_constant",
+            constant=constant,
+            target=target,
+            new_price_date=new_price_date,
+            convention=convention,
+        )
+
+    @staticmethod
+    def _deflate_from_constant(
+        chunk, first_date, first_row, keep, constant, target, new_price_date, convention
+    ) -> CashflowColumns:
+        price_date = first_date if new_price_date is None else new_price_date
+        price_date = np.datetime64(price_date, "D")
+        if convention is None:
+            delta_years = calculate_delta_years_array(
+                start_dates=price_date, end_dates=chunk.dates
+            )
+        else:
+            delta_years = year_fraction(
+                start_dates=price_date, end_dates=chunk.dates, convention=convention
+            )
+        deflator = (1 + constant) ** delta_years
+        return Cashflow._with_intermediates(
+            chunk,
+            keep,
+            intermediates={"delta_years": delta_years, "deflator": deflator},
+            columns={f"{target}_deflated": chunk[target] / deflator},
+        )
+
+    def discount_from_constant_rate(self, interest, target):
+        # as Cashflow.discount_from_constant_rate, assumes a regular schedule
+        return self._with_stage(
+            "discount_from_constant_rate", rate=float(interest.value), target=target
+        )
+
+    @staticmethod
+    def _discount_from_constant_rate(
+        chunk, first_date, first_row, keep, rate, target
+    ) -> CashflowColumns:
+        periods = first_row + np.arange(len(chunk))
+        discount_yield = np.where(periods == 0, 0.0, rate)
+        discount_factor = (1 + rate) ** -periods.astype(np.float64)
+        return Cashflow._with_intermediates(
+            chunk,
+            keep,
+            intermediates={
+                f"{target}_discount_yield": discount_yield,
+                f"{target}_discount_factor": discount_factor,
+            },
+            columns={f"{target}_present_value": chunk[target] * discount_factor},
+        )
+
+    # ------------------------------
+    # reductions
+
+    def totals(self, cols: list[str] | None = None) -> dict[str, float]:
+        totals = {}
+        for chunk in self:
+            for col in chunk.columns if cols is None else cols:
+                totals[col] = totals.get(col, 0.0) + float(chunk[col].sum())
+        return totals
+
+    def npv(self, target, interest=None) -> Value:
+        stream = self
+        if interest is not None:
+            stream = self.discount_from_constant_rate(interest=interest, target=target)
+        col = f"{target}_present_value"
+        value = 0.0
+        price_date = None
+        for chunk in stream:
+            if col not in chunk:
+                raise ValueError(
+                    f"Error: '{col} not in columns=={list(chunk.columns)}."
+                )
+            if price_date is None:
+                price_date = pd.Timestamp(chunk.dates[0])
+            value += float(chunk[col].sum())
+        return Value(value=value, price_date=price_date)
+
+    def agg_to_freq(self, freq: str) -> Cashflow:
+        """Sum the stream into freq buckets, merging one chunk at a time."""
+        assert freq in Cashflow.agg_freqs, "Pandas only allows limited frequencies."
+        total = Cashflow()
+        schedule_freq = None
+        for chunk in self:
+            buckets, schedule_freq = Cashflow._agg_to_freq(chunk, freq)
+            # every bucketed column, as agg_to_freq keeps them all
+            cols = [*total.get_cols(), *buckets.columns]
+            total = Cashflow.sum(
+                [total, Cashflow._from_columns(buckets)],
+                cols=list(dict.fromkeys(cols)),
+            )
+        total.freq = schedule_freq
+        return total
@@ -1,5 +1,12 @@
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
+from .calendars import anbima_calendar
+
 # ----------------------------------------------------------------------
 # format
 
@@ -12,6 +19,147 @@ def datetime_to_string(dt_obj: datetime, format_str="%Y-%m-%d") -> str:
     return dt_obj.strftime(format_str)
 
 
+# ----------------------------------------------------------------------
+# bulk parsing
+
+month_abbreviations = "jan feb mar apr may jun jul aug sep oct nov dec".split()
+
+
+def _parse_digits(codes: np.ndarray, start: int, stop: int):
+    digits = codes[:, start:stop].astype(np.int64) - ord("0")
+    is_valid = np.all((digits >= 0) & (digits <= 9), axis=1)
+    powers = 10 ** np.arange(stop - start - 1, -1, -1)
+    return digits @ powers, is_valid
+
+
+def _parse_iso_date(codes: np.ndarray):
+    year, is_valid_year = _parse_digits(codes, 0, 4)
+    month, is_valid_month = _parse_digits(codes, 5, 7)
+    day, is_valid_day = _parse_digits(codes, 8, 10)
+    is_valid = is_valid_year & is_valid_month & is_valid_day
+    is_valid &= (codes[:, 4] == ord("-")) & (codes[:, 7] == ord("-"))
+    return year, month, day, is_valid
+
+
+def _parse_dd_mon_yy_date(codes: np.ndarray):
+    day, is_valid_day = _parse_digits(codes, 0, 2)
+    short_year, is_valid_year = _parse_digits(codes, 7, 9)
+    # same pivot as strptime's %y
+    year = np.where(short_year < 69, 2000 + short_year, 1900 + short_year)
+
+    # lower-case ascii letters and match them against the month names
+    letters = codes[:, 3:6].astype(np.int64) | 0x20
+    letter_keys = letters @ np.array([1 << 16, 1 << 8, 1])
+    month_keys = np.array(
+        [(ord(a) << 16) + (ord(b) << 8) + ord(c) for a, b, c in month_abbreviations]
+    )
+    is_month = letter_keys[:, None] == month_keys[None, :]
+    month = np.argmax(is_month, axis=1) + 1
+
+    is_valid = is_valid_day & is_valid_year & np.any(is_month, axis=1)
+    is_valid &= (codes[:, 2] == ord("-")) & (codes[:, 6] == ord("-"))
+    return year, month, day, is_valid
+
+
+def _parse_year_month(codes: np.ndarray):
+    year, is_valid_year = _parse_digits(codes, 0, 4)
+    month, is_valid_month = _parse_digits(codes, 5, 7)
+    day = np.ones_like(year)
+    is_valid = is_valid_year & is_valid_month & (codes[:, 4] == ord("-"))
+    return year, month, day, is_valid
+
+
+# format_str -> (number of characters, parser)
+date_formats = {}
+
+
+def register_date_format(format_str: str, width: int, parser):
+    """Register a bulk parser for strings of exactly width characters.
+
+    The parser takes an (n, width) array of unicode code points and
+    returns the year, month and day arrays and a mask of the valid rows.
+    """
+    date_formats[format_str] = (width, parser)
+
+
+register_date_format("%Y-%m-%d", 10, _parse_iso_date)
+register_date_format("%d-%b-%y", 9, _parse_dd_mon_yy_date)
+register_date_format("%Y-%m", 7, _parse_year_month)
+
+
+def infer_date_format(values) -> str:
+    strings = np.char.strip(np.asarray(values).astype(str))
+    if len(strings) == 0:
+        return "%Y-%m-%d"
+    for format_str, (width, parser) in date_formats.items():
+        if len(strings[0]) != width:
+            continue
+        codes = np.asarray(strings[:1]).astype(f"<U{width}")
+        if parser(codes.view(np.uint32).reshape(-1, width))[3][0]:
+            return format_str
+    raise ValueError(
+        f"Couldn't infer the date format of '{strings[0]}'. Registered formats: {list(date_formats)}."
+    )
+
+
+def parse_dates(values, format_str: str | None = None) -> np.ndarray:
+    """Parse a whole column of date strings into a datetime64[D] array.
+
+    Strings are parsed with the parser registered for format_str, or for
+    the format of the first row when format_str is None. Values that are
+    already dates are converted as they are.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[D]")
+    if values.dtype.kind == "O" and values.size > 0:
+        if isinstance(values.flat[0], datetime):
+            return to_datetime64(values)
+
+    strings = np.char.strip(values.astype(str)).reshape(-1)
+    if format_str is None:
+        format_str = infer_date_format(strings)
+    if format_str not in date_formats:
+        raise ValueError(
+            f"format_str=={format_str}, but must be one of {list(date_formats)}."
+        )
+    width, parser = date_formats[format_str]
+
+    is_valid = np.char.str_len(strings) == width
+    codes = strings.astype(f"<U{width}").view(np.uint32).reshape(-1, width)
+    year, month, day, is_valid_format = parser(codes)
+    is_valid &= is_valid_format & (month >= 1) & (month <= 12)
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    is_valid &= (day >= 1) & (day <= days_in_month_array(months))
+
+    if not np.all(is_valid):
+        bad_rows = np.flatnonzero(~is_valid)
+        examples = ", ".join(f"{row}: '{strings[row]}'" for row in bad_rows[:5])
+        raise ValueError(
+            f"{len(bad_rows)} row(s) don't match format '{format_str}' ({examples})."
+        )
+    dates = months.astype("datetime64[D]") + (day - 1)
+    return dates.reshape(values.shape)
+
+
+def parse_date_column(values) -> np.ndarray:
+    """A date column as datetime64[ns]. Dates and datetimes keep their time
+    of day; strings are bulk-parsed when every row matches one registered
+    format, otherwise (other formats, missing values) left to
+    pd.to_datetime."""
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[ns]")
+    if array.dtype.kind == "O" and array.size > 0:
+        if isinstance(array.flat[0], datetime | np.datetime64):
+            return np.asarray(pd.to_datetime(array), dtype="datetime64[ns]")
+    try:
+        return parse_dates(values).astype("datetime64[ns]")
+    except ValueError:
+        return np.asarray(pd.to_datetime(values), dtype="datetime64[ns]")
+
+
 # ----------------------------------------------------------------------
 # date checks
 
@@ -58,65 +206,13 @@ def validatedate_range(dates: list[str], freq="Y"):
 
 
 def calculate_delta_years(start_date: datetime, end_date: datetime) -> float | int:
-    if is_same_date(start_date, end_date):
-        delta_years = end_date.year - start_date.year
-        return delta_years
-
-    elif is_last_day_of_month(start_date) and is_last_day_of_month(end_date):
-        delta_years = (end_date.year - start_date.year) + (
-            end_date.month - start_date.month
-        ) / 12
-        return delta_years
-
-    else:
-        delta_years = (
-            (end_date.year - start_date.year)
-            + (end_date.month - start_date.month) / 12
-            + (end_date.day - start_date.day) / 365
-        )
-
-        leap_years = sum(
-            1
-            for year in range(start_date.year, end_date.year + 1)
-            if is_leap_year(year)
-        )
-        delta_years -= leap_years / 365
-
-    return delta_years
+    delta_years = calculate_delta_years_array(start_date, end_date)
+    return float(delta_years)
 
 
 def calculate_delta_months(start_date: datetime, end_date: datetime) -> int | float:
-    if is_same_date(start_date, end_date):
-        delta_years = (end_date.year - start_date.year) * 12
-        return delta_years
-
-    elif is_same_day(start_date, end_date):
-        delta_years = (end_date.year - start_date.year) * 12 + (
-            end_date.month - start_date.month
-        )
-        return delta_years
-
-    elif is_last_day_of_month(start_date) and is_last_day_of_month(end_date):
-        delta_years = (end_date.year - start_date.year) * 12 + (
-            end_date.month - start_date.month
-        )
-        return delta_years
-
-    else:
-        delta_years = (
-            (end_date.year - start_date.year) * 12
-            + (end_date.month - start_date.month)
-            + (end_date.day - start_date.day) / 30
-        )
-
-        leap_years = sum(
-            1
-            for year in range(start_date.year, end_date.year + 1)
-            if is_leap_year(year)
-        )
-        delta_years -= leap_years / 365.0
-
-    return delta_years
+    delta_months = calculate_delta_months_array(start_date, end_date)
+    return float(delta_months)
 
 
 def calculate_delta_freq(
@@ -134,6 +230,115 @@ def calculate_delta_freq(
     return time_delta
 
 
+# ----------------------------------------------------------------------
+# vectorized delta freqs
+
+
+def split_datetime64(dates) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    dates = to_datetime64(dates)
+    months = dates.astype("datetime64[M]")
+    year = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (dates - months.astype("datetime64[D]")).astype(np.int64) + 1
+    return year, month, day
+
+
+def count_leap_years(start_years, end_years) -> np.ndarray:
+    def leap_years_up_to(years):
+        return years // 4 - years // 100 + years // 400
+
+    start_years = np.asarray(start_years, dtype=np.int64)
+    end_years = np.asarray(end_years, dtype=np.int64)
+    return leap_years_up_to(end_years) - leap_years_up_to(start_years - 1)
+
+
+def calculate_delta_years_array(start_dates, end_dates) -> np.ndarray:
+    start_year, start_month, start_day = split_datetime64(start_dates)
+    end_year, end_month, end_day = split_datetime64(end_dates)
+    is_same_date = (start_month == end_month) & (start_day == end_day)
+    is_month_end = is_last_day_of_month_array(start_dates) & (
+        is_last_day_of_month_array(end_dates)
+    )
+
+    delta_years = (end_year - start_year).astype(np.float64)
+    delta_months = delta_years + (end_month - start_month) / 12
+    delta_days = delta_months + (end_day - start_day) / 365
+    delta_days -= count_leap_years(start_year, end_year) / 365
+
+    return np.where(
+        is_same_date, delta_years, np.where(is_month_end, delta_months, delta_days)
+    )
+
+
+def calculate_delta_months_array(start_dates, end_dates) -> np.ndarray:
+    start_year, start_month, start_day = split_datetime64(start_dates)
+    end_year, end_month, end_day = split_datetime64(end_dates)
+    is_same_date = (start_month == end_month) & (start_day == end_day)
+    is_same_day = start_day == end_day
+    is_month_end = is_last_day_of_month_array(start_dates) & (
+        is_last_day_of_month_array(end_dates)
+    )
+
+    delta_years = ((end_year - start_year) * 12).astype(np.float64)
+    delta_months = delta_years + (end_month - start_month)
+    delta_days = delta_months + (end_day - start_day) / 30
+    delta_days -= count_leap_years(start_year, end_year) / 365.0
+
+    return np.where(
+        is_same_date,
+        delta_years,
+        np.where(is_same_day | is_month_end, delta_months, delta_days),
+    )
+
+
+# ----------------------------------------------------------------------
+# day count conventions
+
+day_count_conventions = ["ACT/365", "ACT/360", "30/360", "BUS/252"]
+
+
+def year_fraction(
+    start_dates, end_dates, convention: str = "ACT/365", holidays=None
+) -> np.ndarray:
+    """Year fractions between date arrays under a day count convention.
+
+    "30/360" follows the ISDA bond basis. "BUS/252" counts business days in
+    [start_date, end_date) on the ANBIMA calendar, or on weekdays that are
+    not in holidays when holidays are given.
+    """
+    if convention not in day_count_conventions:
+        raise ValueError(
+            f"convention=={convention}, but must be one of {day_count_conventions}."
+        )
+    start_dates = to_datetime64(start_dates)
+    end_dates = to_datetime64(end_dates)
+
+    if convention == "ACT/365":
+        return (end_dates - start_dates).astype(np.float64) / 365
+    elif convention == "ACT/360":
+        return (end_dates - start_dates).astype(np.float64) / 360
+    elif convention == "30/360":
+        start_year, start_month, start_day = split_datetime64(start_dates)
+        end_year, end_month, end_day = split_datetime64(end_dates)
+        start_day = np.minimum(start_day, 30)
+        end_day = np.where((end_day == 31) & (start_day == 30), 30, end_day)
+        delta_days = (
+            360 * (end_year - start_year)
+            + 30 * (end_month - start_month)
+            + (end_day - start_day)
+        )
+        return delta_days / 360
+    else:
+        if holidays is None:
+            delta_days = anbima_calendar().business_days_between(start_dates, end_dates)
+        else:
+            start_dates, end_dates = np.broadcast_arrays(start_dates, end_dates)
+            delta_days = np.busday_count(
+                start_dates, end_dates, holidays=to_datetime64(holidays)
+            )
+        return delta_days / 252
+
+
 # ----------------------------------------------------------------------
 # calculate dates
 
@@ -207,82 +412,368 @@ def generate_freq_date_range(start_date: datetime, end_date: datetime, freq: str
         date_range = generate_yearly_date_range(start_date, end_date)
     elif freq == "S":
         date_range = generate_semiannual_date_range(start_date, end_date)
+    elif freq == "Q":
+        date_range = generate_quarterly_date_range(start_date, end_date)
     elif freq == "M":
         date_range = generate_monthly_date_range(start_date, end_date)
     else:
-        raise ValueError(f"freq=={freq}, but must be 'F', 'Y', 'S', 'M'.")
+        raise ValueError(f"freq=={freq}, but must be 'F', 'Y', 'S', 'Q', 'M'.")
     return date_range
 
 
 def generate_yearly_date_range(start_date, end_date):
     assert start_date <= end_date, "Start date must be before end date."
+    date_range = generate_freq_date_array(start_date, end_date, "Y")
+    return datetime64_to_datetime(date_range)
 
-    num_years = int(calculate_delta_years(start_date, end_date) // 1 + 1)
 
-    date_range = []
-    for n in range(num_years):
-        nth_year = start_date.year + n
-        nth_date = start_date.replace(year=nth_year)
-        date_range.append(nth_date)
-    return date_range
+def generate_monthly_date_range(start_date, end_date):
+    assert start_date <= end_date, "Start date must be before end date."
+    date_range = generate_freq_date_array(start_date, end_date, "M")
+    return datetime64_to_datetime(date_range)
 
 
-def generate_monthly_date_range(start_date, end_date):
+def generate_quarterly_date_range(start_date, end_date):
     assert start_date <= end_date, "Start date must be before end date."
+    date_range = generate_freq_date_array(start_date, end_date, "Q")
+    return datetime64_to_datetime(date_range)
 
-    date_range = []
-    next_date = start_date
 
-    months_forward = 0
-    if is_last_day_of_month(start_date):
-        while next_date <= end_date:
-            date_range.append(next_date)
-            months_forward += 1
-            next_date = last_date_in_next_month(start_date, months_forward)
+def generate_semiannual_date_range(start_date, end_date):
+    assert start_date <= end_date, "Start date must be before end date."
+    date_range = generate_freq_date_array(start_date, end_date, "S")
+    return datetime64_to_datetime(date_range)
 
-    else:
-        while next_date <= end_date:
-            date_range.append(next_date)
-            months_forward += 1
-            next_date = same_or_last_date_in_next_month(start_date, months_forward)
 
-    return date_range
+# ----------------------------------------------------------------------
+# vectorized schedules
 
+months_in_schedule_freq = {"Y": 12, "S": 6, "Q": 3, "M": 1}
+months_in_schedule_freq_inv = {v: k for k, v in months_in_schedule_freq.items()}
 
-def generate_semiannual_date_range(start_date, end_date):
-    assert start_date <= end_date, "Start date must be before end date."
 
-    date_range = []
-    next_date = start_date
+def to_datetime64(dates) -> np.ndarray:
+    return np.asarray(dates, dtype="datetime64[D]")
 
-    months_forward = 0
-    if is_last_day_of_month(start_date):
-        while next_date <= end_date:
-            date_range.append(next_date)
-            months_forward += 6
-            next_date = last_date_in_next_month(start_date, months_forward)
 
-    else:
-        while next_date <= end_date:
-            date_range.append(next_date)
-            months_forward += 6
-            next_date = same_or_last_date_in_next_month(start_date, months_forward)
+def datetime64_to_datetime(dates) -> list[datetime]:
+    return to_datetime64(dates).astype("datetime64[us]").astype(object).tolist()
+
+
+def days_in_month_array(months: np.ndarray) -> np.ndarray:
+    months = np.asarray(months, dtype="datetime64[M]")
+    first_days = months.astype("datetime64[D]")
+    next_first_days = (months + 1).astype("datetime64[D]")
+    return (next_first_days - first_days).astype(np.int64)
+
+
+def is_last_day_of_month_array(dates) -> np.ndarray:
+    dates = to_datetime64(dates)
+    return (dates + 1).astype("datetime64[M]") != dates.astype("datetime64[M]")
 
+
+def add_months_array(dates, months_forward, end_of_month=None) -> np.ndarray:
+    """Shift dates by whole months, clamping the day to the target month.
+
+    Rows flagged as end_of_month land on the last day of the target month
+    (as last_date_in_next_month), the others keep their day of the month or
+    its last day, whichever comes first (as same_or_last_date_in_next_month).
+    By default, dates that are the last day of their month are flagged.
+    """
+    dates = to_datetime64(dates)
+    months = dates.astype("datetime64[M]")
+    day = (dates - months.astype("datetime64[D]")).astype(np.int64)
+    target_months = months + np.asarray(months_forward, dtype=np.int64)
+    last_day = days_in_month_array(target_months) - 1
+    if end_of_month is None:
+        end_of_month = is_last_day_of_month_array(dates)
+    day = np.where(end_of_month, last_day, np.minimum(day, last_day))
+    return target_months.astype("datetime64[D]") + day
+
+
+def generate_freq_date_array(start_date, end_date, freq: str) -> np.ndarray:
+    date_range = generate_freq_date_arrays([start_date], [end_date], [freq])[0]
     return date_range
 
 
+def generate_freq_date_arrays(start_dates, end_dates, freqs) -> list[np.ndarray]:
+    """Generate one datetime64[D] schedule per (start_date, end_date, freq) row.
+
+    All schedules are built in a single pass: every candidate date is an
+    offset of whole periods from its own start date, and the candidates
+    past each row's end date are dropped. Month-end start dates stay
+    anchored at month end for "S", "Q" and "M", while "Y" keeps the start
+    date's day of the month (clamped on February 29th).
+    """
+    start_dates = np.atleast_1d(to_datetime64(start_dates))
+    end_dates = np.atleast_1d(to_datetime64(end_dates))
+    freqs = np.broadcast_to(np.asarray(freqs, dtype=str), start_dates.shape)
+    assert start_dates.shape == end_dates.shape, "Dates must have the same shape."
+    n_rows = len(start_dates)
+    if n_rows == 0:
+        return []
+
+    unknown_freqs = set(np.unique(freqs)) - set(months_in_schedule_freq) - {"F"}
+    if unknown_freqs:
+        raise ValueError(
+            f"freq=={sorted(unknown_freqs)}, but must be 'F', 'Y', 'S', 'Q', 'M'."
+        )
+    is_fixed = freqs == "F"
+    assert np.all((start_dates <= end_dates) | is_fixed), (
+        "Start date must be before end date."
+    )
+
+    step = np.ones(n_rows, dtype=np.int64)
+    for freq, months in months_in_schedule_freq.items():
+        step[freqs == freq] = months
+
+    start_months = start_dates.astype("datetime64[M]").astype(np.int64)
+    end_months = end_dates.astype("datetime64[M]").astype(np.int64)
+    n_candidates = np.where(is_fixed, 2, (end_months - start_months) // step + 1)
+
+    row = np.repeat(np.arange(n_rows), n_candidates)
+    first_candidate = np.cumsum(n_candidates) - n_candidates
+    period = np.arange(len(row)) - np.repeat(first_candidate, n_candidates)
+
+    end_of_month = is_last_day_of_month_array(start_dates) & (step != 12)
+    dates = add_months_array(start_dates[row], period * step[row], end_of_month[row])
+    fixed_dates = np.where(period == 0, start_dates[row], end_dates[row])
+    dates = np.where(is_fixed[row], fixed_dates, dates)
+
+    keep = is_fixed[row] | (dates <= end_dates[row])
+    counts = np.bincount(row[keep], minlength=n_rows)
+    return np.split(dates[keep], np.cumsum(counts)[:-1])
+
+
+# ----------------------------------------------------------------------
+# schedule cache
+
+
+class ScheduleCache:
+    """Bounded, thread-safe LRU cache of schedules.
+
+    Schedules are keyed on (start_date, end_date, freq) and returned as
+    read-only datetime64[D] arrays, so they can be shared by every
+    cashflow built on the same dates.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        assert maxsize > 0, "maxsize must be positive."
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._schedules = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._schedules)
+
+    def __str__(self):
+        stats = self.stats()
+        return f"ScheduleCache: {stats['size']}/{stats['maxsize']} schedules, {stats['hits']} hits, {stats['misses']} misses."
+
+    def __repr__(self):
+        return self.__str__()
+
+    @staticmethod
+    def _key(start_date, end_date, freq: str) -> tuple:
+        return (to_datetime64(start_date)[()], to_datetime64(end_date)[()], freq)
+
+    def _lookup(self, key):
+        with self._lock:
+            schedule = self._schedules.get(key)
+            if schedule is None:
+                self.misses += 1
+            else:
+                self._schedules.move_to_end(key)
+                self.hits += 1
+            return schedule
+
+    def _store(self, key, schedule: np.ndarray) -> np.ndarray:
+        schedule.flags.writeable = False
+        with self._lock:
+            self._schedules[key] = schedule
+            self._schedules.move_to_end(key)
+            while len(self._schedules) > self.maxsize:
+                self._schedules.popitem(last=False)
+        return schedule
+
+    def get(self, start_date, end_date, freq: str) -> np.ndarray:
+        key = self._key(start_date, end_date, freq)
+        schedule = self._lookup(key)
+        if schedule is None:
+            schedule = self._store(key, generate_freq_date_array(*key))
+        return schedule
+
+    def get_many(self, start_dates, end_dates, freqs) -> list[np.ndarray]:
+        start_dates = np.atleast_1d(to_datetime64(start_dates))
+        end_dates = np.atleast_1d(to_datetime64(end_dates))
+        freqs = np.broadcast_to(np.asarray(freqs, dtype=str), start_dates.shape)
+        keys = [
+            self._key(start_date, end_date, str(freq))
+            for start_date, end_date, freq in zip(start_dates, end_dates, freqs)
+        ]
+        schedules = [self._lookup(key) for key in keys]
+
+        missing = {key for key, schedule in zip(keys, schedules) if schedule is None}
+        if missing:
+            missing = list(missing)
+            generated = generate_freq_date_arrays(*zip(*missing))
+            generated = {
+                key: self._store(key, schedule.copy())
+                for key, schedule in zip(missing, generated)
+            }
+            schedules = [
+                generated[key] if schedule is None else schedule
+                for key, schedule in zip(keys, schedules)
+            ]
+        return schedules
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._schedules),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._schedules.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+schedule_cache = ScheduleCache()
+
+
 # ----------------------------------------------------------------------
 # det freq
 
 
-def det_freq_of_date_range(date_range):
-    start_date = min(date_range)
-    end_date = max(date_range)
-    candidate_freqs = ["Y", "S", "M"]
-    for freq in candidate_freqs:
-        candidatedate_range = generate_freq_date_range(start_date, end_date, freq)
-        if len(candidatedate_range) != len(date_range):
-            continue
-        elif all(candidatedate_range == date_range):
-            return freq
+def det_freq_of_date_range(date_range) -> str:
+    """Detect the schedule freq of a date range in a single pass.
+
+    Returns "Y", "S", "Q" or "M" when the dates are exactly the schedule
+    generate_freq_date_range would build between the first and last dates,
+    "F" for any other pair of increasing dates, and "X" otherwise.
+    """
+    dates = np.atleast_1d(to_datetime64(date_range))
+    if len(dates) == 0:
+        return "X"
+    if len(dates) == 1:
+        return "Y"
+
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    delta_months = np.unique(np.diff(months))
+    if len(delta_months) == 1 and delta_months[0] in months_in_schedule_freq_inv:
+        step = int(delta_months[0])
+        end_of_month = is_last_day_of_month_array(dates[0]) and step != 12
+        expected_dates = add_months_array(dates[0], months - months[0], end_of_month)
+        if np.array_equal(dates, expected_dates):
+            return months_in_schedule_freq_inv[step]
+
+    if len(dates) == 2 and dates[0] < dates[1]:
+        return "F"
     return "X"
+
+
+# ----------------------------------------------------------------------
+# buckets
+
+# months per bucket and whether the bucket ends on the last business day
+bucket_freqs = {
+    "ME": (1, False),
+    "QE": (3, False),
+    "YE": (12, False),
+    "BME": (1, True),
+    "BQE": (3, True),
+    "BYE": (12, True),
+}
+
+
+class BucketIndex:
+    """Assignment of dates to buckets, reusable across columns and positions.
+
+    Buckets follow pandas resample(freq).sum() for "ME", "QE", "YE", "BME",
+    "BQE", "BYE" and "W" (labelled by their end, empty buckets included),
+    or custom bands from from_edges. Aggregation is a single np.bincount.
+    """
+
+    __slots__ = ("dates", "bucket_ids", "labels")
+
+    def __init__(self, dates, bucket_ids, labels):
+        self.dates = dates
+        self.bucket_ids = bucket_ids
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __str__(self):
+        return f"BucketIndex: {len(self.dates)} dates in {len(self)} buckets."
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def from_freq(cls, dates, freq: str) -> "BucketIndex":
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if freq == "W":
+            # weeks end on sunday; 1970-01-01 was a thursday
+            days = dates.astype(np.int64)
+            periods = (days + 3) // 7
+            period_range = np.arange(periods.min(), periods.max() + 1)
+            labels = (period_range * 7 + 3).astype("datetime64[D]")
+        elif freq in bucket_freqs:
+            n_months, is_business = bucket_freqs[freq]
+            periods = dates.astype("datetime64[M]").astype(np.int64) // n_months
+            if is_business:
+                # dates after the last business day belong to the next bucket
+                periods += dates > cls._period_ends(periods, n_months, is_business)
+            period_range = np.arange(periods.min(), periods.max() + 1)
+            labels = cls._period_ends(period_range, n_months, is_business)
+        else:
+            raise ValueError(
+                f"freq=={freq}, but must be 'W' or in {set(bucket_freqs)}."
+            )
+        return cls(dates, periods - period_range[0], labels)
+
+    @classmethod
+    def from_edges(cls, dates, edges, labels=None) -> "BucketIndex":
+        """Bucket i holds dates in [edges[i], edges[i + 1]); the last bucket
+        is open-ended. Labels default to the left edges."""
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        edges = np.asarray(edges, dtype="datetime64[D]")
+        assert np.all(np.diff(edges) > np.timedelta64(0)), "Edges must increase."
+        bucket_ids = np.searchsorted(edges, dates, side="right") - 1
+        if np.any(bucket_ids < 0):
+            raise ValueError(f"Dates must be on or after the first edge {edges[0]}.")
+        labels = edges if labels is None else np.asarray(labels)
+        assert len(labels) == len(edges), "One label per edge."
+        return cls(dates, bucket_ids, labels)
+
+    @staticmethod
+    def _period_ends(periods, n_months, is_business) -> np.ndarray:
+        next_months = ((periods + 1) * n_months).astype("datetime64[M]")
+        ends = next_months.astype("datetime64[D]") - 1
+        if is_business:
+            ends = np.busday_offset(ends, 0, roll="backward")
+        return ends
+
+    def counts(self) -> np.ndarray:
+        return np.bincount(self.bucket_ids, minlength=len(self))
+
+    def aggregate(self, values) -> np.ndarray:
+        """Sum values by bucket: (dates,) -> (buckets,), or
+        (rows x dates) -> (rows x buckets) in one pass."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            return np.bincount(self.bucket_ids, weights=values, minlength=len(self))
+        n_rows = values.shape[0]
+        bucket_ids = (np.arange(n_rows)[:, None] * len(self) + self.bucket_ids).ravel()
+        sums = np.bincount(
+            bucket_ids, weights=values.ravel(), minlength=n_rows * len(self)
+        )
+        return sums.reshape(n_rows, len(self))
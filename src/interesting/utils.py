@@ -1,5 +1,7 @@
 from collections import OrderedDict
 
+import numpy as np
+
 # ----------------------------------------------------------------------
 # Constants
 
@@ -29,6 +31,22 @@ bonds_info = {
 
 brazilian_tax_rate_after_n_days = {0: 0.225, 181: 0.20, 361: 0.175, 721: 0.15}
 
+# iof on the yield of redemptions within 30 days (decreto 6.306/2007)
+brazilian_iof_rate_after_n_days = {
+    days: rate
+    for days, rate in enumerate(
+        [1.00, 0.96, 0.93, 0.90, 0.86, 0.83, 0.80, 0.76, 0.73, 0.70, 0.66]
+        + [0.63, 0.60, 0.56, 0.53, 0.50, 0.46, 0.43, 0.40, 0.36, 0.33]
+        + [0.30, 0.26, 0.23, 0.20, 0.16, 0.13, 0.10, 0.06, 0.03, 0.00]
+    )
+}
+
+# bracket tables: {holding period in days: rate from that day on}
+tax_rate_tables = {
+    "ir": brazilian_tax_rate_after_n_days,
+    "iof": brazilian_iof_rate_after_n_days,
+}
+
 # focus: up until 2027 (Jan 2024)
 brazil_focus_inflation_ipca = {
     "2024": 0.0381,
@@ -40,14 +58,27 @@ brazil_focus_inflation_ipca = {
 figsize_medium = (12, 6)
 
 
+def register_tax_rate_table(name: str, table: dict):
+    if not table or min(table) != 0:
+        raise ValueError("A tax rate table must start at day 0.")
+    tax_rate_tables[name] = dict(sorted(table.items()))
+
+
+def tax_rates_after_n_days(days, table="ir") -> np.ndarray:
+    if isinstance(table, str):
+        table = tax_rate_tables[table]
+    bounds = np.array(sorted(table), dtype=np.int64)
+    rates = np.array([table[bound] for bound in bounds], dtype=np.float64)
+    days = np.asarray(days, dtype=np.int64)
+    if np.any(days < 0):
+        raise ValueError("days should be non-negative.")
+    return rates[np.searchsorted(bounds, days, side="right") - 1]
+
+
 def calc_brazilian_tax_rate(days):
     if not isinstance(days, int) or days < 0:
         raise ValueError("days should be a non-negative integer.")
-    tax_rate_brackets = OrderedDict([(0, 0.225), (181, 0.2), (361, 0.175), (721, 0.15)])
-    for upper_bound, rate in tax_rate_brackets.items():
-        if days < upper_bound:
-            return rate
-    return rate
+    return float(tax_rates_after_n_days(days, table=brazilian_tax_rate_after_n_days))
 
 
 # ----------------------------------------------------------------------
@@ -0,0 +1,125 @@
+import multiprocessing
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src.interesting.bonds import NTNB, Bond
+from src.interesting.cache import CashflowCache, cache_key
+from src.interesting.cashflow import Cashflow
+from src.interesting.interest import CompoundInterestRate
+
+
+def ntnb(end_date="2030-01-15", capital=-1000):
+    return NTNB(
+        start_date="2024-01-15",
+        end_date=end_date,
+        interest=CompoundInterestRate(value=0.06, freq="Y"),
+        inflation=CompoundInterestRate(value=0.04, freq="Y"),
+        initial_capital_pmt=capital,
+    )
+
+
+@pytest.fixture
+def bond_cache(tmp_path, monkeypatch):
+    cache = CashflowCache(tmp_path)
+    monkeypatch.setattr(Bond, "cache", cache)
+    return cache
+
+
+def test_cache_key_is_canonical():
+    rate = CompoundInterestRate(value=0.1, freq="Y")
+    key = cache_key("f", {"start_date": "2024-01-15", "capital": 1000, "rate": rate})
+    assert key == cache_key(
+        "f",
+        {
+            "capital": 1000.0,
+            "rate": CompoundInterestRate(value=0.1, freq="Y"),
+            "start_date": pd.Timestamp("2024-01-15"),
+        },
+    )
+    assert key != cache_key(
+        "f", {"start_date": datetime(2024, 1, 16), "capital": 1000, "rate": rate}
+    )
+    with pytest.raises(TypeError):
+        cache_key("f", {"rate": object()})
+
+
+def test_bonds_are_loaded_from_cache(bond_cache, monkeypatch):
+    expected = ntnb()
+    assert bond_cache.stats()["misses"] == 1
+    assert bond_cache.stats()["pending"] == 1
+    bond_cache.flush()
+
+    # a new process: nothing in memory, the entry is read from disk
+    warm_cache = CashflowCache(bond_cache.directory)
+    monkeypatch.setattr(Bond, "cache", warm_cache)
+    monkeypatch.setattr(Cashflow, "from_regular_interest", pytest.fail)
+    for _ in range(2):
+        bond = ntnb()
+        assert bond.data.equals(expected.data)
+        assert bond.freq == "S"
+    stats = warm_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 0, 1)
+
+
+def test_cache_writes_batches(tmp_path):
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=10, freq="M", start_date="2020-01-31", end_date="2021-01-31"
+    )
+    cache = CashflowCache(tmp_path, batch_size=3)
+    for key in ["first", "second", "third", "fourth"]:
+        cache.put(key, cf)
+    stats = cache.stats()
+    assert (stats["entries"], stats["pending"], stats["segments"]) == (3, 1, 1)
+    cache.close()
+    assert CashflowCache(tmp_path).stats()["entries"] == 4
+
+    # one segment serves every entry written with it
+    warm_cache = CashflowCache(tmp_path)
+    assert warm_cache.get("second").data.equals(cf.data)
+    assert warm_cache.get("fourth").freq == "M"
+    assert warm_cache.get("fifth") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=10, freq="M", start_date="2020-01-31", end_date="2021-01-31"
+    )
+    cache = CashflowCache(tmp_path, batch_size=1)
+    cache.put("first", cf)
+    nbytes = cache.stats()["nbytes"]
+    cache.maxbytes = 3 * nbytes
+    # mtimes have a coarse resolution: space the segments out
+    for key in ["second", "third"]:
+        time.sleep(0.02)
+        cache.put(key, cf)
+    time.sleep(0.02)
+    # other processes see the hit: the segment is used again
+    assert CashflowCache(tmp_path).get("first") is not None
+    time.sleep(0.02)
+    cache.put("fourth", cf)
+
+    stats = cache.stats()
+    assert stats["nbytes"] <= cache.maxbytes
+    assert stats["evictions"] >= 1
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+
+
+def _build_bonds(directory):
+    with CashflowCache(directory) as cache:
+        Bond.cache = cache
+        return [ntnb(capital=capital).data["brutto"].sum() for capital in range(-20, 0)]
+
+
+def test_cache_shared_between_processes(tmp_path, monkeypatch):
+    # restores Bond.cache once the test is done
+    monkeypatch.setattr(Bond, "cache", None)
+    expected = _build_bonds(tmp_path)
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        results = pool.map(_build_bonds, [tmp_path] * 8)
+    assert all(result == expected for result in results)
+    assert CashflowCache(tmp_path).stats()["entries"] == 20
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from src.interesting.calendars import (
+    BusinessCalendar,
+    add_business_days,
+    anbima_calendar,
+    brazilian_national_holidays,
+    business_days_between,
+    easter_sundays,
+    roll_following,
+    roll_modified_following,
+)
+
+
+@pytest.mark.parametrize(
+    "year, expected_output",
+    [(2023, "2023-04-09"), (2024, "2024-03-31"), (2025, "2025-04-20")],
+)
+def test_easter_sundays(year, expected_output):
+    assert easter_sundays([year])[0] == np.datetime64(expected_output)
+
+
+def test_brazilian_national_holidays():
+    holidays = brazilian_national_holidays(2024, 2024)
+    expected_holidays = [
+        "2024-01-01",
+        "2024-02-12",
+        "2024-02-13",
+        "2024-03-29",
+        "2024-04-21",
+        "2024-05-01",
+        "2024-05-30",
+        "2024-09-07",
+        "2024-10-12",
+        "2024-11-02",
+        "2024-11-15",
+        "2024-11-20",
+        "2024-12-25",
+    ]
+    assert list(holidays) == list(np.array(expected_holidays, dtype="datetime64[D]"))
+    assert np.datetime64("2023-11-20") not in brazilian_national_holidays(2023, 2023)
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date, expected_output",
+    [
+        ("2023-01-01", "2024-01-01", 249),
+        ("2024-01-01", "2025-01-01", 253),
+        ("2024-02-09", "2024-02-15", 2),
+        ("2024-01-02", "2024-01-02", 0),
+    ],
+)
+def test_business_days_between(start_date, end_date, expected_output):
+    assert business_days_between(start_date, end_date) == expected_output
+
+
+def test_business_calendar_matches_numpy():
+    calendar = anbima_calendar()
+    dates = np.arange(np.datetime64("2001-03-01"), np.datetime64("2098-01-01"), 5)
+    holidays = calendar.holidays
+    assert np.array_equal(
+        business_days_between(dates[:-100], dates[100:]),
+        np.busday_count(dates[:-100], dates[100:], holidays=holidays),
+    )
+    assert np.array_equal(
+        add_business_days(dates, 21),
+        np.busday_offset(dates, 21, roll="following", holidays=holidays),
+    )
+    assert np.array_equal(
+        calendar.add_business_days(dates, -21, roll="preceding"),
+        np.busday_offset(dates, -21, roll="preceding", holidays=holidays),
+    )
+    assert np.array_equal(
+        roll_following(dates),
+        np.busday_offset(dates, 0, roll="following", holidays=holidays),
+    )
+    assert np.array_equal(
+        roll_modified_following(dates),
+        np.busday_offset(dates, 0, roll="modifiedfollowing", holidays=holidays),
+    )
+
+
+def test_business_calendar_out_of_range():
+    calendar = BusinessCalendar(
+        holidays=[], start_date="2024-01-01", end_date="2024-12-31"
+    )
+    assert calendar.business_days_between("2024-01-01", "2024-12-31") == 261
+    with pytest.raises(ValueError):
+        calendar.business_days_between("2023-12-29", "2024-01-05")
+    with pytest.raises(ValueError):
+        calendar.add_business_days("2024-12-30", 5)
@@ -0,0 +1,384 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.interesting.cashflow import Cashflow
+from src.interesting.interest import CompoundInterestRate, TermStructure
+from src.interesting.portfolio import Portfolio
+from src.interesting.time import BucketIndex
+
+
+def test_freq_is_cached_until_index_changes():
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=100, start_date="2023-01-31", end_date="2024-01-31", freq="M"
+    )
+    assert cf.freq == "M"
+    cf.tax()
+    assert cf.freq == "M"
+    cf.agg_to_freq("QE")
+    assert cf.freq == "Q"
+    cf.data = cf.data.iloc[[0, 2, 3]]
+    assert cf.freq == "X"
+
+
+def test_freq_of_fixed_cashflow():
+    df = pd.DataFrame(
+        {"brutto": [-100, 120]},
+        index=pd.DatetimeIndex(["2023-01-10", "2025-03-10"], name="date"),
+    )
+    cf = Cashflow.from_pandas(df)
+    assert cf.freq == "F"
+
+
+def test_deflate_from_constant():
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=100, start_date="2023-01-31", end_date="2026-01-31", freq="Y"
+    )
+    cf.deflate_from_constant(constant=0.1, target="brutto")
+    assert list(cf.data["delta_years"]) == [0.0, 1.0, 2.0, 3.0]
+    assert round(cf.data["brutto_deflated"].iloc[-1], 4) == round(100 / 1.1**3, 4)
+
+    cf.deflate_from_constant(constant=0.1, target="brutto", convention="ACT/365")
+    assert round(cf.data["delta_years"].iloc[2], 6) == round(731 / 365, 6)
+
+
+def test_from_json():
+    rows = [
+        {"date": "2024-12-31", "brutto": -100},
+        {"date": "2025-12-31", "brutto": 110},
+    ]
+    cf = Cashflow.from_json(rows)
+    assert list(cf.data.index) == [
+        pd.Timestamp("2024-12-31"),
+        pd.Timestamp("2025-12-31"),
+    ]
+    assert cf.freq == "Y"
+
+
+def test_from_pandas_keeps_intraday_dates():
+    df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2024-01-31 09:00", "2024-01-31 12:00"]),
+            "brutto": [-100.0, 110.0],
+        }
+    )
+    cf = Cashflow.from_pandas(df)
+    assert list(cf.data.index) == list(df["date"])
+
+
+def test_from_json_other_date_formats():
+    rows = [
+        {"date": "2024-01-31T00:00:00", "brutto": 100.0},
+        {"date": "2024-02-29T00:00:00", "brutto": 100.0},
+    ]
+    cf = Cashflow.from_json(rows)
+    assert list(cf.data.index) == list(pd.to_datetime(["2024-01-31", "2024-02-29"]))
+
+
+def test_data_view_is_built_on_demand():
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=100, start_date="2023-01-31", end_date="2024-01-31", freq="M"
+    )
+    data = cf.data
+    assert cf.data is data
+    data["double"] = 2 * data["brutto"]
+    cf.tax().discount_from_constant_rate(
+        interest=CompoundInterestRate(value=0.01, freq="M"), target="double"
+    )
+    assert cf._data is None
+    assert "double_present_value" in cf.get_cols()
+    assert cf.data is not data
+    assert list(cf.data["netto"]) == list(cf.data["brutto"] - cf.data["tax"])
+
+
+def test_old_data_view_edits_do_not_leak():
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=100, start_date="2023-01-31", end_date="2024-01-31", freq="M"
+    )
+    data = cf.data
+    cf.tax()
+    data.loc[data.index[1], "brutto"] = 9999.0
+    assert cf.data["brutto"].iloc[1] == 100.0
+    assert list(cf.data["netto"]) == list(cf.data["brutto"] - cf.data["tax"])
+
+
+def test_reads_share_the_data_view():
+    df = pd.DataFrame(
+        {"brutto": [-100.0, 5.0, 110.0]},
+        index=pd.DatetimeIndex(["2023-01-31", "2023-02-28", "2023-03-31"], name="date"),
+    )
+    cf = Cashflow.from_pandas(df)
+    assert cf._data is None
+    data = cf.data
+    assert cf.freq == "M"
+    assert cf.get_cols() == ["brutto"]
+    assert np.shares_memory(cf._get_columns()["brutto"], data["brutto"].to_numpy())
+    assert not np.shares_memory(cf._own_columns()["brutto"], data["brutto"].to_numpy())
+
+
+def test_tax_many_matches_tax():
+    cashflows = [
+        Cashflow.from_regular_pmt(
+            pmt_amount=100, start_date=start_date, end_date="2026-01-31", freq="Q"
+        )
+        for start_date in ["2023-01-31", "2024-07-31"]
+    ]
+    taxed = [Cashflow.from_pandas(cf.data).tax() for cf in cashflows]
+    Cashflow.tax_many(cashflows)
+    for cf, expected in zip(cashflows, taxed):
+        pd.testing.assert_frame_equal(cf.data, expected.data)
+    assert cashflows[1].data["taxRate"].iloc[1] == 0.225
+
+
+def test_irr_of_irregular_cashflow_uses_xirr():
+    df = pd.DataFrame(
+        {"brutto": [-100, 5, 110]},
+        index=pd.DatetimeIndex(["2023-01-10", "2023-04-02", "2024-01-10"], name="date"),
+    )
+    cf = Cashflow.from_pandas(df)
+    assert cf.freq == "X"
+    assert cf.irr("brutto").value == cf.xirr("brutto").value
+    assert round(cf.irr("brutto").value, 4) == 0.1559
+
+
+def test_npv_grid_matches_npv():
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=100, start_date="2023-01-31", end_date="2024-01-31", freq="M"
+    )
+    rates = [0.0, 0.01, 0.02]
+    grid = cf.npv_grid("brutto", rates)
+    assert cf.get_cols() == ["interest_paid", "principal", "brutto"]
+    for rate, value in zip(rates, grid):
+        npv = Cashflow.from_pandas(cf.data).npv(
+            "brutto", CompoundInterestRate(value=rate, freq="M")
+        )
+        assert abs(npv.value - value) < 1e-9
+
+    curves = [[0.0] + [0.01] * 12, [0.0] * 13]
+    assert abs(cf.npv_grid("brutto", curves) - grid[[1, 0]]).max() < 1e-9
+
+
+def test_risk_measures_many():
+    cashflows = [
+        Cashflow.from_regular_interest(
+            interest=CompoundInterestRate(value=0.1, freq="Y"),
+            freq="Y",
+            start_date="2023-01-31",
+            end_date=end_date,
+            initial_capital_pmt=-100,
+            final_capital_pmt=100,
+        )
+        for end_date in ["2026-01-31", "2028-01-31"]
+    ]
+    interest = CompoundInterestRate(value=0.1, freq="Y")
+    measures = Cashflow.risk_measures_many(cashflows, "brutto", interest=interest)
+    single = cashflows[0].risk_measures("brutto", interest=interest)
+    assert abs(measures["macaulay_duration"][0] - single["macaulay_duration"]) < 1e-9
+    at_xirr = Cashflow.risk_measures_many(cashflows, "brutto")
+    assert abs(at_xirr["macaulay_duration"][0] - single["macaulay_duration"]) < 1e-4
+    assert round(single["present_value"], 9) == 100
+    assert round(single["macaulay_duration"], 4) == 2.7355
+    assert measures["macaulay_duration"][1] > measures["macaulay_duration"][0]
+
+
+@pytest.mark.parametrize("convention", [None, "BUS/252", "ACT/360"])
+def test_risk_measures_at_own_yield_price_the_cost(convention):
+    # zero coupon bought on 2024-01-02, redeemed on 2027-01-01
+    df = pd.DataFrame(
+        {"brutto": [-743.5, 1000.0]},
+        index=pd.DatetimeIndex(["2024-01-02", "2027-01-01"], name="date"),
+    )
+    cf = Cashflow.from_pandas(df)
+    measures = cf.risk_measures("brutto", convention=convention)
+    assert abs(measures["present_value"] - 743.5) < 1e-9
+
+
+def test_sum_merges_dates_and_unions_columns():
+    cf1 = Cashflow.from_json(
+        [
+            {"date": "2024-01-31", "brutto": -100, "principal": -100},
+            {"date": "2024-03-31", "brutto": 110, "principal": 100},
+        ]
+    )
+    cf2 = Cashflow.from_json(
+        [
+            {"date": "2024-02-29", "brutto": -50},
+            {"date": "2024-03-31", "brutto": 60},
+        ]
+    )
+    total = Cashflow.sum([cf1, cf2, Cashflow()])
+    assert total.get_cols() == ["brutto", "principal"]
+    assert list(total.data["brutto"]) == [-100, -50, 170]
+    assert list(total.data["principal"]) == [-100, 0, 100]
+    assert list(Cashflow.sum([cf1, cf2], cols=["brutto"]).get_cols()) == ["brutto"]
+
+    pd.testing.assert_frame_equal((cf1 + cf2).data, total.data)
+    pd.testing.assert_frame_equal(sum([cf1, cf2]).data, total.data)
+
+
+def test_sum_skips_rates_and_factors():
+    cashflows = [
+        Cashflow.from_regular_pmt(
+            pmt_amount=100, start_date="2023-01-31", end_date="2025-01-31", freq="Y"
+        )
+        .tax()
+        .discount_from_constant_rate(
+            interest=CompoundInterestRate(value=0.1, freq="Y"), target="netto"
+        )
+        for _ in range(2)
+    ]
+    total = Cashflow.sum(cashflows)
+    assert "taxRate" not in total.get_cols()
+    assert "delta_days" not in total.get_cols()
+    assert "netto_discount_factor" not in total.get_cols()
+    single = cashflows[0].data
+    assert list(total.data["tax"]) == list(2 * single["tax"])
+    assert list(total.data["netto_present_value"]) == list(
+        2 * single["netto_present_value"]
+    )
+
+    total = Cashflow.sum(cashflows, cols=["tax", "taxRate"])
+    assert list(total.data["taxRate"]) == list(2 * single["taxRate"])
+
+
+def test_portfolio_total_after_tax():
+    portfolio = Portfolio().add_bond(
+        [
+            Cashflow.from_regular_pmt(
+                pmt_amount=100, start_date="2023-01-31", end_date=end_date, freq="Y"
+            )
+            for end_date in ["2025-01-31", "2026-01-31"]
+        ]
+    )
+    assert "tax" not in portfolio.total_cashflow.get_cols()
+    total = portfolio.tax().total_cashflow
+    assert "tax" in total.get_cols()
+    assert "taxRate" not in total.get_cols()
+
+
+@pytest.mark.parametrize(
+    "pmt_amount, n_periods, gradient_yield, gradient_amount",
+    [
+        (100, 5, 0.0, 0.0),
+        (100, 5, 0.1, 0.0),
+        (100, 5, 0.0, 10.0),
+        (100, 0, 0.0, 0.0),
+    ],
+)
+def test_gen_amount_pmts(pmt_amount, n_periods, gradient_yield, gradient_amount):
+    pmts = Cashflow.gen_amount_pmts(
+        pmt_amount=pmt_amount,
+        n_periods=n_periods,
+        gradient_yield=gradient_yield,
+        gradient_amount=gradient_amount,
+    )
+    if gradient_yield != 0.0:
+        expected = [pmt_amount * (1 + gradient_yield) ** p for p in range(n_periods)]
+    else:
+        expected = [pmt_amount + gradient_amount * p for p in range(n_periods)]
+    assert list(pmts) == expected
+
+
+def test_gen_pmts_many_pads_rows():
+    pmts = Cashflow.gen_amount_pmts_many(
+        pmt_amounts=[100, 50], n_periods=[3, 1], gradient_yields=[0.1, 0.0]
+    )
+    assert pmts.shape == (2, 3)
+    assert list(pmts[1]) == [50, 0, 0]
+
+    pmts = Cashflow.gen_interest_pmts_many(
+        interest_rates=[0.01, 0.02], n_periods=[2, 3], initial_capital_pmts=-100
+    )
+    assert list(pmts.round(9)[0]) == [1.0, 1.0, 0.0]
+    assert list(pmts.round(9)[1]) == [2.0, 2.0, 2.0]
+
+
+def test_generated_cashflows_skip_freq_detection(monkeypatch):
+    def fail(dates):
+        raise AssertionError("freq should be known")
+
+    monkeypatch.setattr("src.interesting.cashflow.det_freq_of_date_range", fail)
+    cf = Cashflow.from_regular_interest(
+        interest=CompoundInterestRate(value=0.01, freq="M"),
+        freq="Q",
+        start_date="2023-01-31",
+        end_date="2025-01-31",
+        initial_capital_pmt=-100,
+        final_capital_pmt=100,
+    )
+    assert cf.freq == "Q"
+    assert cf.irr("brutto").value > 0
+
+
+def test_discount_irregular_index_with_convention():
+    df = pd.DataFrame(
+        {"brutto": [-100.0, 5.0, 110.0]},
+        index=pd.DatetimeIndex(["2023-01-10", "2023-04-02", "2024-01-10"], name="date"),
+    )
+    cf = Cashflow.from_pandas(df)
+    interest = CompoundInterestRate(value=0.1, freq="Y")
+    with pytest.raises(ValueError):
+        cf.discount_from_constant_rate(interest=interest, target="brutto")
+
+    cf.discount_from_constant_rate(
+        interest=interest, target="brutto", convention="ACT/365"
+    )
+    times = [0, 82 / 365, 1]
+    expected = [1.1**-t for t in times]
+    assert np.allclose(cf.data["brutto_discount_factor"], expected)
+
+    curve = pd.DataFrame({"yield": [0.0, 0.1, 0.1]})
+    cf.discount_from_yield_curve(curve, target="brutto", convention="ACT/365")
+    assert np.allclose(cf.data["brutto_discount_factor"], expected)
+
+    monthly = CompoundInterestRate(value=1.1 ** (1 / 12) - 1, freq="M")
+    npv = cf.npv("brutto", interest=monthly, convention="ACT/365")
+    assert abs(npv.value - sum(df["brutto"] * expected)) < 1e-9
+
+
+def test_discount_from_term_structure():
+    df = pd.DataFrame(
+        {"brutto": [-100.0, 5.0, 110.0]},
+        index=pd.DatetimeIndex(["2023-01-10", "2023-04-02", "2024-01-10"], name="date"),
+    )
+    curve = TermStructure(
+        "2023-01-10", ["2023-07-10", "2024-01-10"], [0.1, 0.12], convention="ACT/365"
+    )
+    cf = Cashflow.from_pandas(df).discount_from_yield_curve(curve, target="brutto")
+    expected = curve.discount_factors(df.index.to_numpy())
+    assert np.allclose(cf.data["brutto_discount_factor"], expected)
+    assert cf.data["brutto_discount_factor"].iloc[-1] == pytest.approx(1 / 1.12)
+    assert np.allclose(cf.data["brutto_present_value"], df["brutto"] * expected)
+
+    # same curve, resampled to the cashflow's grid
+    regular = Cashflow.from_regular_pmt(
+        pmt_amount=100, start_date="2023-01-31", end_date="2024-01-31", freq="M"
+    )
+    dates = regular.data.index.to_numpy()
+    curve = TermStructure(
+        dates[0], dates[1:], np.full(len(dates) - 1, 0.1), convention="ACT/365"
+    )
+    yields = curve.discount_factors(dates)[:-1] / curve.discount_factors(dates)[1:] - 1
+    expected = regular.discount_from_yield_curve(
+        pd.DataFrame({"yield": np.concatenate([[0.0], yields])}), target="brutto"
+    ).data["brutto_present_value"]
+    cf = regular.discount_from_yield_curve(curve, target="brutto")
+    assert np.allclose(cf.data["brutto_present_value"], expected)
+
+
+def test_agg_to_freq_with_bucket_index():
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=100, start_date="2023-01-31", end_date="2024-01-31", freq="M"
+    )
+    expected = cf.data.resample("QE").sum()
+    pd.testing.assert_frame_equal(
+        Cashflow.from_pandas(cf.data).agg_to_freq("QE").data,
+        expected,
+        check_freq=False,
+    )
+
+    bucket_index = BucketIndex.from_edges(
+        cf._get_columns().dates, ["2023-01-01", "2023-07-01"]
+    )
+    cf.agg_to_freq(bucket_index=bucket_index)
+    assert list(cf.data["brutto"]) == [500, 700]
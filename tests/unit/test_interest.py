@@ -0,0 +1,200 @@
+import numpy as np
+import pydantic
+import pytest
+
+from src.interesting.interest import (
+    CompoundInterestRate,
+    ContinuousInterestRate,
+    InterestRateArray,
+    InterestRateCurve,
+    SimpleInterestRate,
+    TermStructure,
+    equivalent_value,
+)
+from src.interesting.time import year_fraction
+
+
+@pytest.mark.parametrize(
+    "rate",
+    [
+        CompoundInterestRate(value=0.1, freq="Y"),
+        SimpleInterestRate(value=0.1, freq="Y"),
+        ContinuousInterestRate(value=0.1, freq="Y"),
+    ],
+)
+@pytest.mark.parametrize(
+    "convert",
+    [
+        lambda rate: rate.convert_to_equivalent(new_freq="M"),
+        lambda rate: rate.convert_to_compound(),
+        lambda rate: rate.convert_to_simple(),
+        lambda rate: rate.convert_to_continuous(),
+    ],
+)
+def test_converted_rates_match_validated_rates(rate, convert):
+    converted = convert(rate)
+    validated = type(converted)(value=converted.value, freq=converted.freq)
+    assert converted.model_dump() == validated.model_dump()
+    assert converted.model_fields_set == validated.model_fields_set
+    assert converted.model_copy(update={"value": 0.2}).value == 0.2
+    assert str(converted) == str(validated)
+
+
+def test_user_facing_rates_are_validated():
+    with pytest.raises(pydantic.ValidationError):
+        CompoundInterestRate(value=0.1, freq="W")
+    with pytest.raises(pydantic.ValidationError):
+        SimpleInterestRate(value="ten percent", freq="Y")
+
+
+@pytest.mark.parametrize(
+    "rate, new_freq, expected",
+    [
+        (CompoundInterestRate(value=0.1, freq="Y"), "S", 1.1**0.5 - 1),
+        (SimpleInterestRate(value=0.12, freq="Y"), "S", 0.06),
+        (SimpleInterestRate(value=0.12, freq="Y"), "Q", 0.03),
+        (SimpleInterestRate(value=0.03, freq="Q"), "Y", 0.12),
+        (ContinuousInterestRate(value=0.12, freq="Y"), "S", 0.06),
+        (ContinuousInterestRate(value=0.01, freq="M"), "Q", 0.03),
+    ],
+)
+def test_convert_to_equivalent(rate, new_freq, expected):
+    converted = rate.convert_to_equivalent(new_freq=new_freq)
+    assert (converted.freq, converted.regime) == (new_freq, rate.regime)
+    assert converted.value == pytest.approx(expected)
+    back = converted.convert_to_equivalent(new_freq=rate.freq)
+    assert back.value == pytest.approx(rate.value)
+
+
+def test_equivalent_values_are_cached():
+    rate = CompoundInterestRate(value=0.0123, freq="Y")
+    hits = equivalent_value.cache_info().hits
+    for _ in range(3):
+        rate.convert_to_equivalent(new_freq="M")
+    assert equivalent_value.cache_info().hits == hits + 2
+    # converting to the same freq keeps the value exactly
+    assert rate.convert_to_equivalent(new_freq="Y").value == 0.0123
+    with pytest.raises(AssertionError):
+        rate.convert_to_equivalent(new_freq="W")
+
+
+@pytest.mark.parametrize("regime", ["compound", "simple", "continuous"])
+@pytest.mark.parametrize("convert", ["compound", "simple", "continuous"])
+def test_rate_array_regime_conversions_match_scalars(regime, convert):
+    rates = InterestRateArray([0.01, 0.05, 0.1], freq="M", regime=regime)
+    converted = getattr(rates, f"convert_to_{convert}")()
+    assert converted.regime == convert
+    for rate, expected in zip(rates.to_rates(), converted.values):
+        assert getattr(rate, f"convert_to_{convert}")().value == pytest.approx(expected)
+
+
+def test_rate_array_equivalent_freqs():
+    rates = InterestRateArray([0.1, 0.2], freq="Y")
+    monthly = rates.convert_to_equivalent(new_freq="M")
+    assert monthly.freq == "M"
+    assert np.allclose((1 + monthly.values) ** 12 - 1, rates.values)
+    assert np.allclose(monthly.convert_to_equivalent(new_freq="Y").values, rates.values)
+
+    simple = InterestRateArray([0.12], freq="Y", regime="simple")
+    assert simple.convert_to_equivalent(new_freq="S").values[0] == pytest.approx(0.06)
+
+
+@pytest.mark.parametrize("regime", ["compound", "simple", "continuous"])
+def test_rate_array_time_travel_broadcasts(regime):
+    rates = InterestRateArray([0.05, 0.1], freq="Y", regime=regime)
+    times = np.array([0.0, 1.0, 2.5])
+    future_values = rates.future_value(100, times[:, None])
+    assert future_values.shape == (3, 2)
+    scalar = rates[1]
+    assert future_values[2, 1] == pytest.approx(scalar.future_value(100, 2.5))
+    assert np.allclose(rates.present_value(future_values, times[:, None]), 100)
+
+    solved = InterestRateArray.from_equation(
+        100, future_values[2], 2.5, freq="Y", regime=regime
+    )
+    assert np.allclose(solved.values, rates.values)
+
+
+def test_rate_array_from_scalar_rates():
+    rates = InterestRateArray.from_rates(
+        [
+            CompoundInterestRate(value=0.1, freq="Y"),
+            CompoundInterestRate(value=0.01, freq="M"),
+            ContinuousInterestRate(value=0.1, freq="Y"),
+        ]
+    )
+    assert (rates.freq, rates.regime) == ("Y", "compound")
+    assert rates.values == pytest.approx([0.1, 1.01**12 - 1, np.exp(0.1) - 1])
+    assert isinstance(rates[0], CompoundInterestRate)
+    assert len(rates[1:]) == 2
+
+
+# ----------------------------------------------------------------------
+# term structure
+
+vertex_days = [21, 63, 126, 252, 504]
+vertex_rates = [0.10, 0.105, 0.11, 0.112, 0.115]
+
+
+@pytest.mark.parametrize(
+    "interpolation", ["flat_forward", "linear_zero", "monotone_cubic"]
+)
+def test_term_structure_vertices(interpolation):
+    curve = TermStructure.from_business_days(
+        "2024-01-02", vertex_days, vertex_rates, interpolation=interpolation
+    )
+    times = year_fraction("2024-01-02", curve.dates, convention="BUS/252")
+    assert times == pytest.approx(np.array(vertex_days) / 252)
+    expected = (1 + np.array(vertex_rates)) ** -times
+    assert np.allclose(curve.discount_factors(curve.dates), expected)
+    assert np.allclose(curve.zero_rates_at(curve.dates), vertex_rates)
+
+    dates = np.arange(np.datetime64("2024-01-02"), np.datetime64("2027-01-01"), 3)
+    discount_factors = curve.discount_factors(dates)
+    assert discount_factors[0] == 1.0
+    assert np.all(np.diff(discount_factors) <= 0)
+
+
+def test_term_structure_flat_forward():
+    curve = TermStructure.from_business_days("2024-01-02", vertex_days, vertex_rates)
+    dates = np.arange(curve.dates[1], curve.dates[2] + 1)
+    steps = np.diff(curve.times(dates))
+    # weekends and holidays add no time
+    business = steps > 0
+    forwards = np.diff(-np.log(curve.discount_factors(dates)))[business]
+    forwards = forwards / steps[business]
+    assert np.allclose(forwards, forwards[0])
+
+
+def test_term_structure_monotone_cubic_keeps_shape():
+    # rates jump: the cubic must not overshoot between vertices
+    curve = TermStructure(
+        "2024-01-01",
+        ["2024-07-01", "2025-01-01", "2025-07-01", "2026-01-01"],
+        [0.10, 0.10, 0.20, 0.20],
+        convention="ACT/365",
+        interpolation="monotone_cubic",
+    )
+    dates = np.arange(np.datetime64("2024-01-01"), np.datetime64("2026-01-02"))
+    log_factors = np.log(curve.discount_factors(dates))
+    assert np.all(np.diff(log_factors) <= 0)
+
+
+def test_term_structure_validation():
+    with pytest.raises(ValueError):
+        TermStructure("2024-01-01", ["2025-01-01"], [0.1], interpolation="spline")
+    with pytest.raises(AssertionError):
+        TermStructure("2024-01-01", ["2025-01-01", "2024-06-01"], [0.1, 0.1])
+
+
+def test_curve_to_term_structure():
+    dates = np.array(
+        ["2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30"],
+        dtype="datetime64[D]",
+    )
+    yields = [0.0, 0.01, 0.012, 0.011]
+    curve = InterestRateCurve(yields=yields, regime="compound")
+    term_structure = curve.to_term_structure(dates, convention="ACT/365")
+    assert np.allclose(
+        term_structure.discount_factors(dates), 1 / np.cumprod(1 + np.array(yields))
+    )
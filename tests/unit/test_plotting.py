@@ -0,0 +1,52 @@
+import matplotlib
+import numpy as np
+import pytest
+
+from src.interesting.cashflow import Cashflow
+from src.interesting.plotting import lttb, min_max_decimate, top_indices
+
+matplotlib.use("Agg")
+
+
+@pytest.mark.parametrize("n_out", [3, 50, 500])
+def test_lttb_keeps_ends_and_spike(n_out):
+    x = np.arange(10_000.0)
+    y = np.sin(x / 100)
+    y[5_000] = 10
+    rows = lttb(x, y, n_out)
+    assert len(rows) == n_out
+    assert rows[0] == 0 and rows[-1] == len(x) - 1
+    assert np.all(np.diff(rows) > 0)
+    if n_out > 3:
+        assert 5_000 in rows
+
+
+def test_min_max_decimate_keeps_extremes():
+    y = np.random.default_rng(0).normal(size=10_001)
+    rows = min_max_decimate(y, 100)
+    assert len(rows) <= 200
+    assert np.argmin(y) in rows and np.argmax(y) in rows
+    assert np.array_equal(min_max_decimate(y[:150], 100), np.arange(150))
+
+
+def test_top_indices():
+    assert top_indices([1, -5, 3, 0], 2).tolist() == [1, 2]
+    assert top_indices([1, 2], 5).tolist() == [0, 1]
+
+
+def test_plots_cap_points_and_annotations():
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=10,
+        freq="M",
+        start_date="2000-01-01",
+        end_date="2300-01-01",
+        initial_capital_pmt=-1000,
+        final_capital_pmt=1000,
+    )
+    ax = cf.plot_arrow(["brutto"], max_points=200, max_annotations=10).axes[0]
+    assert len(ax.texts) == 10
+    assert len(ax.collections[0].get_segments()) <= 200
+
+    ax = cf.plot_line(["brutto"], max_points=200).axes[0]
+    assert len(ax.lines[0].get_xdata()) == 200
+    assert len(ax.get_xticks()) <= Cashflow.max_ticks
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.interesting.bonds import LTN, NTNB
+from src.interesting.cashflow import Cashflow
+from src.interesting.interest import CompoundInterestRate
+from src.interesting.portfolio import Portfolio
+
+
+def book():
+    ltns = [
+        LTN(
+            start_date="2024-01-15",
+            end_date=end_date,
+            interest=CompoundInterestRate(value=0.1, freq="Y"),
+            initial_capital_pmt=-1000,
+        )
+        for end_date in ["2026-01-15", "2027-06-15"]
+    ]
+    ntnb = NTNB(
+        start_date="2024-01-15",
+        end_date="2030-01-15",
+        interest=CompoundInterestRate(value=0.06, freq="Y"),
+        inflation=CompoundInterestRate(value=0.04, freq="Y"),
+        initial_capital_pmt=-1000,
+    )
+    return Portfolio().add_bond([ltns[0], ntnb, ltns[1]])
+
+
+@pytest.mark.parametrize("freq", ["QE", "YE"])
+def test_agg_to_freq_matches_resample(freq):
+    portfolio = book()
+    buckets = portfolio.agg_to_freq(freq)
+    # both LTNs are named "ltn": bonds are labeled by position
+    assert list(buckets.columns) == [0, 1, 2]
+    for col, bond in enumerate(portfolio.bonds):
+        expected = bond.data["brutto"].resample(freq).sum()
+        values = buckets.iloc[:, col]
+        assert np.allclose(values.loc[expected.index], expected)
+        assert np.allclose(values.drop(expected.index), 0)
+
+
+def test_agg_to_freq_with_edges():
+    portfolio = book()
+    edges = np.array(["2024-01-01", "2026-01-01", "2028-01-01"], dtype="datetime64[D]")
+    buckets = portfolio.agg_to_freq(edges=edges, labels=["short", "mid", "long"])
+    assert list(buckets.index) == ["short", "mid", "long"]
+    totals = [bond.data["brutto"].sum() for bond in portfolio.bonds]
+    assert np.allclose(buckets.sum(), totals)
+    assert buckets.iloc[2, 0] == 0
+
+
+def test_risk_measures_by_bond_position():
+    portfolio = book()
+    interest = CompoundInterestRate(value=0.1, freq="Y")
+    measures = portfolio.risk_measures(interest=interest)
+    assert list(measures.index) == [0, 1, 2]
+    expected = Cashflow.risk_measures_many(portfolio.bonds, "brutto", interest=interest)
+    for col, values in expected.items():
+        assert np.allclose(measures[col], values)
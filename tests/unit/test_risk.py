@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.interesting.risk import risk_measures
+
+
+def test_risk_measures_of_coupon_bond():
+    # 3 year 10% annual coupon bond at a 10% yield
+    measures = risk_measures([[10, 10, 110]], [1, 2, 3], 0.1)
+    assert round(measures["present_value"][0], 10) == 100
+    assert round(measures["macaulay_duration"][0], 4) == 2.7355
+    assert round(measures["modified_duration"][0], 4) == 2.4869
+    assert round(measures["dv01"][0], 6) == round(
+        measures["modified_duration"][0] / 100, 6
+    )
+
+
+def test_risk_measures_match_repricing():
+    values = np.array([[5, 5, 105, 0], [0, 0, 0, 100]])
+    times = np.array([[0.5, 1.0, 1.5, 0.0], [0.0, 0.0, 0.0, 2.0]])
+    yields = np.array([0.08, 0.12])
+    measures = risk_measures(values, times, yields)
+
+    def price(bump):
+        return (values * (1 + yields[:, None] + bump) ** -times).sum(1)
+
+    bump = 1e-5
+    first = (price(-bump) - price(bump)) / (2 * bump)
+    second = (price(-bump) - 2 * price(0) + price(bump)) / bump**2
+    assert np.allclose(measures["modified_duration"], first / price(0))
+    assert np.allclose(measures["convexity"], second / price(0), rtol=1e-4)
+    assert np.allclose(measures["macaulay_duration"][1], 2.0)
@@ -0,0 +1,86 @@
+import numpy as np
+import numpy_financial as npf
+import pytest
+
+from src.interesting import solvers
+from src.interesting.solvers import brent, irr_many, xirr_many
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [-100, 110],
+        [-100, 10, 10, 110],
+        [-1000, *[8.0] * 359, 1008],
+        [100, -50, -60],
+        [-100, 0, 0, 0, 150],
+    ],
+)
+def test_irr_many_matches_npf(values):
+    solution = irr_many(values)
+    assert solution.converged[0]
+    assert abs(solution.rates[0] - npf.irr(values)) < 1e-9
+
+
+def test_irr_many_batch():
+    values = np.array([[-100, 110, 0], [-100, 10, 110], [100, 10, 10]])
+    solution = irr_many(values)
+    assert list(solution.converged) == [True, True, False]
+    assert abs(solution.rates[0] - 0.1) < 1e-12
+    assert abs(solution.rates[1] - 0.1) < 1e-12
+    assert np.isnan(solution.rates[2])
+
+
+@pytest.mark.parametrize("guess", [0.0, 0.1])
+def test_irr_many_long_bonds_converge_by_newton(guess, monkeypatch):
+    # 30-year monthly bonds: a newton step from a high guess overshoots
+    # below -100%, where the npv overflows, and has to backtrack
+    def no_brent(*args):
+        raise AssertionError("fell back to brent")
+
+    monkeypatch.setattr(solvers, "_closest_rate", no_brent)
+    rng = np.random.default_rng(0)
+    values = np.tile(rng.uniform(2, 15, size=(200, 1)), 361)
+    values[:, 0] = -1000 * rng.uniform(0.8, 1.2, size=200)
+    values[:, -1] += 1000
+    solution = irr_many(values, guess=guess)
+    assert solution.converged.all()
+    assert solution.iterations.max() <= 20
+    npvs = (values * (1 + solution.rates[:, None]) ** -np.arange(361)).sum(1)
+    assert np.allclose(npvs, 0, atol=1e-6)
+
+
+def test_irr_many_picks_the_rate_closest_to_zero():
+    # rates of -5% and 30%: newton from 10% alone would find 30%
+    values = np.polynomial.polynomial.polyfromroots([1 / 0.95, 1 / 1.3]) * 100
+    solution = irr_many(values)
+    assert abs(solution.rates[0] - -0.05) < 1e-9
+    assert abs(solution.rates[0] - npf.irr(values)) < 1e-9
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(300, 8)) * 100
+    expected = np.array([npf.irr(row) for row in values])
+    rates = irr_many(values).rates
+    has_rate = np.isfinite(expected)
+    assert np.allclose(rates[has_rate], expected[has_rate], atol=1e-9)
+
+
+def test_xirr_many():
+    values = [[-10000, 2750, 4250, 3250, 2750], [-100, 110, 0, 0, 0]]
+    dates = np.array(
+        [
+            ["2008-01-01", "2008-03-01", "2008-10-30", "2009-02-15", "2009-04-01"],
+            ["2021-01-01", "2022-01-01", "NaT", "NaT", "NaT"],
+        ],
+        dtype="datetime64[D]",
+    )
+    solution = xirr_many(values, dates)
+    assert abs(solution.rates[0] - 0.373362535) < 1e-8
+    assert abs(solution.rates[1] - 0.1) < 1e-12
+
+
+def test_brent():
+    root, _ = brent(lambda x: x**3 - 2 * x - 5, 2, 3)
+    assert abs(root - 2.0945514815423265) < 1e-12
+    root, _ = brent(lambda x: x**2 + 1, -1, 1)
+    assert np.isnan(root)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from src.interesting.bonds import LTN, NTNB
+from src.interesting.cashflow import Cashflow
+from src.interesting.interest import CompoundInterestRate
+from src.interesting.portfolio import Portfolio
+
+
+def ntnb():
+    return NTNB(
+        start_date="2024-01-15",
+        end_date="2030-01-15",
+        interest=CompoundInterestRate(value=0.06, freq="Y"),
+        inflation=CompoundInterestRate(value=0.04, freq="Y"),
+        initial_capital_pmt=-1000,
+    )
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_cashflow_round_trip(tmp_path, fmt, monkeypatch):
+    cf = Cashflow.from_regular_pmt(
+        pmt_amount=10,
+        freq="Q",
+        start_date="2020-01-31",
+        end_date="2025-01-31",
+        initial_capital_pmt=-1000,
+        final_capital_pmt=1000,
+    ).tax()
+    path = tmp_path / f"cf.{fmt}"
+    getattr(cf, f"to_{fmt}")(path)
+
+    # the freq comes from the metadata, not from detection
+    monkeypatch.setattr("src.interesting.cashflow.det_freq_of_date_range", pytest.fail)
+    loaded = getattr(Cashflow, f"from_{fmt}")(path)
+    assert loaded.freq == "Q"
+    assert loaded.data.equals(cf.data)
+
+
+def test_arrow_columns_are_views(tmp_path):
+    path = tmp_path / "bond.arrow"
+    ntnb().to_arrow(path)
+    data = Cashflow.from_arrow(path)._get_columns()
+    assert not data["brutto"].flags.owndata
+    assert not data["brutto"].flags.writeable
+
+
+def test_bond_round_trip(tmp_path):
+    bond = ntnb()
+    path = tmp_path / "bond.parquet"
+    bond.to_parquet(path)
+    loaded = NTNB.from_parquet(path)
+    assert isinstance(loaded, NTNB)
+    assert (loaded.name, loaded.issuer, loaded.index_name) == (
+        "ntnb",
+        "tesouro nacional",
+        "ipca",
+    )
+    assert not loaded.is_nominal and loaded.is_taxable
+    assert loaded.data.equals(bond.data)
+    with pytest.raises(ValueError):
+        NTNB.from_arrow_table(Cashflow().to_arrow_table())
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_portfolio_round_trip(tmp_path, fmt):
+    ltns = [
+        LTN(
+            start_date="2024-01-15",
+            end_date=end_date,
+            interest=CompoundInterestRate(value=0.1, freq="Y"),
+            initial_capital_pmt=-1000,
+        )
+        for end_date in ["2026-01-15", "2027-06-15"]
+    ]
+    portfolio = Portfolio().add_bond([ltns[0], ntnb(), ltns[1]])
+    path = tmp_path / f"book.{fmt}"
+    getattr(portfolio, f"to_{fmt}")(path)
+
+    loaded = getattr(Portfolio, f"from_{fmt}")(path)
+    assert [type(bond) for bond in loaded.bonds] == [LTN, NTNB, LTN]
+    for bond, original in zip(loaded.bonds, portfolio.bonds):
+        assert bond.data.equals(original.data)
+        assert bond.freq == original.freq
+    assert np.allclose(
+        loaded.total_cashflow.data["brutto"], portfolio.total_cashflow.data["brutto"]
+    )
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.interesting.cashflow import Cashflow
+from src.interesting.interest import CompoundInterestRate
+from src.interesting.streaming import CashflowStream
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1000])
+def test_stream_matches_cashflow(chunk_size):
+    interest = CompoundInterestRate(value=0.01, freq="M")
+    kwargs = {
+        "pmt_amount": 100,
+        "freq": "M",
+        "start_date": "2023-01-31",
+        "end_date": "2025-01-31",
+        "initial_capital_pmt": -1000,
+        "final_capital_pmt": 1000,
+        "gradient_yield": 0.01,
+    }
+    cf = Cashflow.from_regular_pmt(**kwargs)
+    stream = CashflowStream.from_regular_pmt(chunk_size=chunk_size, **kwargs)
+
+    chunks = list(stream)
+    assert max(len(chunk) for chunk in chunks) <= chunk_size
+    dates = np.concatenate([chunk.dates for chunk in chunks])
+    brutto = np.concatenate([chunk["brutto"] for chunk in chunks])
+    assert list(dates) == list(cf.data.index)
+    assert np.allclose(brutto, cf.data["brutto"])
+
+    stream = stream.tax().deflate_from_constant(constant=0.04, target="netto")
+    cf.tax().deflate_from_constant(constant=0.04, target="netto")
+    npv = stream.npv("netto_deflated", interest=interest)
+    assert abs(npv.value - cf.npv("netto_deflated", interest=interest).value) < 1e-9
+    assert npv.price_date == cf.npv("netto_deflated").price_date
+
+    totals = stream.totals(["tax", "netto"])
+    assert abs(totals["tax"] - cf.data["tax"].sum()) < 1e-9
+
+    buckets = stream.agg_to_freq("YE")
+    expected = Cashflow.from_pandas(cf.data).agg_to_freq("YE")
+    assert buckets.freq == "Y"
+    pd.testing.assert_series_equal(
+        buckets.data["netto"], expected.data["netto"], check_freq=False
+    )
+
+
+def test_daily_stream_is_chunked():
+    stream = CashflowStream.from_regular_pmt(
+        pmt_amount=1,
+        freq="D",
+        start_date="2000-01-01",
+        end_date="2039-12-31",
+        chunk_size=365,
+    )
+    sizes = [len(chunk) for chunk in stream]
+    assert max(sizes) == 365
+    assert sum(sizes) == 14610
+    assert stream.totals(["brutto"])["brutto"] == 14609
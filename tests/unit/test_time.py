@@ -1,18 +1,31 @@
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
 import pytest
 
 from src.interesting.time import (
+    BucketIndex,
+    ScheduleCache,
     calculate_delta_months,
+    calculate_delta_months_array,
     calculate_delta_years,
+    calculate_delta_years_array,
     datetime_to_string,
+    det_freq_of_date_range,
+    generate_freq_date_array,
+    generate_freq_date_arrays,
     generate_monthly_date_range,
+    generate_semiannual_date_range,
     generate_yearly_date_range,
     is_last_day_of_month,
     is_leap_year,
     last_date_in_next_month,
+    parse_date_column,
+    parse_dates,
     same_or_last_date_in_next_month,
     string_to_datetime,
+    year_fraction,
 )
 
 
@@ -219,3 +232,245 @@ def test_last_date_in_next_month(input_date, months_to_add, expected_output):
 )
 def test_same_or_last_date_in_next_month(input_date, months_to_add, expected_output):
     assert same_or_last_date_in_next_month(input_date, months_to_add) == expected_output
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date, freq, expected_output",
+    [
+        (
+            "2023-01-31",
+            "2023-05-31",
+            "M",
+            ["2023-01-31", "2023-02-28", "2023-03-31", "2023-04-30", "2023-05-31"],
+        ),
+        ("2023-01-30", "2023-04-29", "M", ["2023-01-30", "2023-02-28", "2023-03-30"]),
+        ("2023-08-31", "2024-08-31", "S", ["2023-08-31", "2024-02-29", "2024-08-31"]),
+        (
+            "2023-11-30",
+            "2024-08-31",
+            "Q",
+            ["2023-11-30", "2024-02-29", "2024-05-31", "2024-08-31"],
+        ),
+        ("2023-02-28", "2025-03-01", "Y", ["2023-02-28", "2024-02-28", "2025-02-28"]),
+        ("2024-02-29", "2026-02-28", "Y", ["2024-02-29", "2025-02-28", "2026-02-28"]),
+        ("2023-01-10", "2029-01-10", "F", ["2023-01-10", "2029-01-10"]),
+    ],
+)
+def test_generate_freq_date_array(start_date, end_date, freq, expected_output):
+    result = generate_freq_date_array(start_date, end_date, freq)
+    assert result.dtype == np.dtype("datetime64[D]")
+    assert list(result) == list(np.array(expected_output, dtype="datetime64[D]"))
+
+
+@pytest.mark.parametrize("day", [1, 14, 28, 29, 30, 31])
+def test_generate_semiannual_date_range_matches_offsets(day):
+    start_date = datetime(2023, 1, day)
+    end_date = datetime(2031, 12, 31)
+    expected_dates = [start_date]
+    for months_forward in range(6, 108, 6):
+        if is_last_day_of_month(start_date):
+            expected_dates.append(last_date_in_next_month(start_date, months_forward))
+        else:
+            expected_dates.append(
+                same_or_last_date_in_next_month(start_date, months_forward)
+            )
+    assert generate_semiannual_date_range(start_date, end_date) == expected_dates
+
+
+def test_generate_freq_date_arrays():
+    start_dates = ["2023-01-31", "2023-03-15", "2023-06-30"]
+    end_dates = ["2023-04-30", "2024-03-15", "2023-06-30"]
+    freqs = ["M", "S", "Y"]
+    result = generate_freq_date_arrays(start_dates, end_dates, freqs)
+    assert len(result) == 3
+    for start_date, end_date, freq, dates in zip(start_dates, end_dates, freqs, result):
+        assert list(dates) == list(generate_freq_date_array(start_date, end_date, freq))
+    assert [len(dates) for dates in result] == [4, 3, 1]
+
+
+def test_generate_freq_date_arrays_invalid_freq():
+    with pytest.raises(ValueError):
+        generate_freq_date_arrays(["2023-01-31"], ["2023-04-30"], ["W"])
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date, freq",
+    [
+        ("2023-01-31", "2025-01-31", "M"),
+        ("2023-01-30", "2025-01-30", "M"),
+        ("2023-02-28", "2033-02-28", "S"),
+        ("2023-11-30", "2026-08-31", "Q"),
+        ("2024-02-29", "2034-02-28", "Y"),
+        ("2023-07-12", "2045-01-02", "S"),
+    ],
+)
+def test_det_freq_of_date_range(start_date, end_date, freq):
+    dates = generate_freq_date_array(start_date, end_date, freq)
+    assert det_freq_of_date_range(dates) == freq
+
+
+@pytest.mark.parametrize(
+    "dates, expected_output",
+    [
+        (["2023-01-10"], "Y"),
+        (["2023-01-10", "2029-03-10"], "F"),
+        (["2023-01-10", "2023-02-10", "2023-04-10"], "X"),
+        (["2023-01-31", "2023-02-28", "2023-03-28"], "X"),
+        (["2023-02-10", "2023-01-10", "2023-03-10"], "X"),
+        (["2023-02-10", "2023-01-10"], "X"),
+    ],
+)
+def test_det_freq_of_date_range_irregular(dates, expected_output):
+    assert det_freq_of_date_range(dates) == expected_output
+
+
+def test_calculate_delta_years_array():
+    start_date = datetime(2022, 1, 31)
+    end_dates = [datetime(2023, 7, 30), datetime(2023, 7, 31), datetime(2024, 1, 31)]
+    result = calculate_delta_years_array(start_date, end_dates)
+    expected = [calculate_delta_years(start_date, date) for date in end_dates]
+    assert list(result) == expected
+
+
+def test_calculate_delta_months_array():
+    start_dates = [datetime(2022, 1, 1), datetime(2020, 2, 29), datetime(2020, 1, 14)]
+    end_dates = [datetime(2022, 12, 31), datetime(2020, 6, 30), datetime(2020, 3, 1)]
+    result = calculate_delta_months_array(start_dates, end_dates)
+    expected = [calculate_delta_months(s, e) for s, e in zip(start_dates, end_dates)]
+    assert list(result) == expected
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date, convention, expected_output",
+    [
+        ("2024-01-01", "2025-01-01", "ACT/365", 366 / 365),
+        ("2024-01-01", "2025-01-01", "ACT/360", 366 / 360),
+        ("2024-01-31", "2024-03-31", "30/360", 60 / 360),
+        ("2024-02-28", "2024-08-31", "30/360", 183 / 360),
+        ("2024-01-01", "2024-01-08", "BUS/252", 4 / 252),
+    ],
+)
+def test_year_fraction(start_date, end_date, convention, expected_output):
+    result = year_fraction([start_date], [end_date], convention)
+    assert abs(result[0] - expected_output) < 1e-12
+
+
+def test_year_fraction_holidays():
+    result = year_fraction("2024-01-01", "2024-01-08", "BUS/252", holidays=[])
+    assert result * 252 == 5
+
+
+def test_year_fraction_invalid_convention():
+    with pytest.raises(ValueError):
+        year_fraction("2024-01-01", "2024-01-08", "ACT/ACT")
+
+
+def test_schedule_cache():
+    cache = ScheduleCache(maxsize=2)
+    schedule = cache.get(datetime(2023, 1, 31), datetime(2024, 1, 31), "M")
+    assert list(schedule) == list(
+        generate_freq_date_array("2023-01-31", "2024-01-31", "M")
+    )
+    assert not schedule.flags.writeable
+    assert cache.get("2023-01-31", "2024-01-31", "M") is schedule
+    cache.get("2023-01-31", "2025-01-31", "S")
+    cache.get("2023-01-31", "2026-01-31", "Y")
+    assert cache.stats() == {"hits": 1, "misses": 3, "size": 2, "maxsize": 2}
+    assert cache.get("2023-01-31", "2024-01-31", "M") is not schedule
+
+
+def test_schedule_cache_get_many():
+    cache = ScheduleCache()
+    start_dates = ["2023-01-31", "2023-03-15", "2023-01-31"]
+    end_dates = ["2023-04-30", "2024-03-15", "2023-04-30"]
+    schedules = cache.get_many(start_dates, end_dates, ["M", "S", "M"])
+    assert schedules[0] is schedules[2]
+    assert len(schedules[1]) == 3
+    assert cache.get("2023-03-15", "2024-03-15", "S") is schedules[1]
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize(
+    "values, format_str, expected_output",
+    [
+        (["2022-01-18", "2024-02-29"], "%Y-%m-%d", ["2022-01-18", "2024-02-29"]),
+        (["02-Jun-22", "13-nov-69"], "%d-%b-%y", ["2022-06-02", "1969-11-13"]),
+        (["1994-01", "2023-12"], "%Y-%m", ["1994-01-01", "2023-12-01"]),
+        (["02-Jun-22", "31-Dec-68"], None, ["2022-06-02", "2068-12-31"]),
+        ([datetime(2022, 1, 18)], None, ["2022-01-18"]),
+    ],
+)
+def test_parse_dates(values, format_str, expected_output):
+    result = parse_dates(values, format_str)
+    assert result.dtype == np.dtype("datetime64[D]")
+    assert list(result) == list(np.array(expected_output, dtype="datetime64[D]"))
+
+
+@pytest.mark.parametrize(
+    "values, format_str",
+    [
+        (["2022-01-18", "2023-02-29"], "%Y-%m-%d"),
+        (["2022-01-18", "2022-1-18"], "%Y-%m-%d"),
+        (["02-Jun-22", "02-Jux-22"], "%d-%b-%y"),
+        (["1994-13"], "%Y-%m"),
+        (["2022-01-18"], "%d/%m/%Y"),
+        (["18/01/2022"], None),
+    ],
+)
+def test_parse_dates_invalid(values, format_str):
+    with pytest.raises(ValueError):
+        parse_dates(values, format_str)
+
+
+@pytest.mark.filterwarnings("ignore:Parsing dates in")
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["2024-01-31"],
+        ["2024-01-31T00:00:00"],
+        ["2024-01-31 00:00:00"],
+        ["2024/01/31"],
+        ["31/01/2024"],
+    ],
+)
+def test_parse_date_column_falls_back_to_pandas(values):
+    result = parse_date_column(values)
+    assert result.dtype == np.dtype("datetime64[ns]")
+    assert list(result) == [np.datetime64("2024-01-31", "ns")]
+
+
+def test_parse_date_column_keeps_time_of_day():
+    values = pd.to_datetime(["2024-01-31 09:00", "2024-01-31 12:00"])
+    for column in [values, values.to_pydatetime(), pd.Series(values)]:
+        result = parse_date_column(column)
+        assert list(result) == list(values.to_numpy())
+
+
+def test_parse_date_column_missing_values():
+    result = parse_date_column(["2024-01-31", None])
+    assert result[0] == np.datetime64("2024-01-31", "ns")
+    assert np.isnat(result[1])
+
+
+@pytest.mark.parametrize("freq", ["ME", "QE", "YE", "BME", "BQE", "BYE", "W"])
+def test_bucket_index_matches_resample(freq):
+    dates = pd.DatetimeIndex(
+        ["2023-09-29", "2023-09-30", "2023-10-01", "2023-12-31", "2024-03-30"]
+    )
+    values = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    expected = pd.Series(values, index=dates).resample(freq).sum()
+    bucket_index = BucketIndex.from_freq(dates, freq)
+    assert list(bucket_index.labels) == list(expected.index.values.astype("M8[D]"))
+    assert list(bucket_index.aggregate(values)) == list(expected)
+    assert bucket_index.aggregate([values, 2 * values])[1].sum() == 30
+
+
+def test_bucket_index_from_edges():
+    dates = ["2024-01-01", "2024-01-20", "2024-03-01", "2025-06-01"]
+    edges = ["2024-01-01", "2024-01-31", "2024-03-31", "2024-12-31"]
+    bucket_index = BucketIndex.from_edges(dates, edges)
+    assert list(bucket_index.bucket_ids) == [0, 0, 1, 3]
+    assert list(bucket_index.counts()) == [2, 1, 0, 1]
+    with pytest.raises(ValueError):
+        BucketIndex.from_edges(["2023-12-31"], edges)
@@ -1,6 +1,14 @@
 import pytest
 
-from src.interesting.utils import future_value, is_close, is_whole_number, present_value
+from src.interesting.utils import (
+    calc_brazilian_tax_rate,
+    future_value,
+    is_close,
+    is_whole_number,
+    present_value,
+    register_tax_rate_table,
+    tax_rates_after_n_days,
+)
 
 
 @pytest.mark.parametrize(
@@ -29,3 +37,41 @@ def test_is_whole_number():
     assert is_whole_number(1)
     assert is_whole_number(1.0)
     assert not is_whole_number(1.5)
+
+
+@pytest.mark.parametrize(
+    "days, expected_output",
+    [
+        (0, 0.225),
+        (180, 0.225),
+        (181, 0.20),
+        (360, 0.20),
+        (361, 0.175),
+        (720, 0.175),
+        (721, 0.15),
+        (5000, 0.15),
+    ],
+)
+def test_calc_brazilian_tax_rate(days, expected_output):
+    assert calc_brazilian_tax_rate(days) == expected_output
+
+
+def test_tax_rates_after_n_days():
+    rates = tax_rates_after_n_days([0, 181, 721])
+    assert list(rates) == [0.225, 0.20, 0.15]
+    assert list(tax_rates_after_n_days([0, 1, 29, 30, 31], table="iof")) == [
+        1.0,
+        0.96,
+        0.03,
+        0.0,
+        0.0,
+    ]
+    with pytest.raises(ValueError):
+        tax_rates_after_n_days([-1])
+
+
+def test_register_tax_rate_table():
+    register_tax_rate_table("flat", {0: 0.1})
+    assert list(tax_rates_after_n_days([0, 1000], table="flat")) == [0.1, 0.1]
+    with pytest.raises(ValueError):
+        register_tax_rate_table("no_day_zero", {30: 0.1})